@@ -1,11 +1,16 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
 from io import StringIO
 import math
 
+from iqr_charts import boxplot_figure, histogram_figure
+from iqr_ingest import (
+    list_excel_sheets, parse_numbers, read_csv_column, read_csv_header, read_excel_column,
+    read_excel_header, sniff_csv_format
+)
+from iqr_stats import cached_histogram, cached_iqr_statistics
+
 # تنظیمات صفحه
 st.set_page_config(
     page_title="محاسبه‌گر IQR - روش دقیق",
@@ -46,66 +51,12 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# تابع محاسبه میانه
-def calculate_median(data):
-    if not data:
-        return None
-    n = len(data)
-    sorted_data = sorted(data)
-    if n % 2 == 1:
-        return sorted_data[n // 2]
-    else:
-        return (sorted_data[n // 2 - 1] + sorted_data[n // 2]) / 2
-
-# تابع محاسبه آمار با روش دقیق
-def calculate_iqr_statistics(numbers):
-    if len(numbers) < 3:
-        return None
-    
-    sorted_numbers = sorted(numbers)
-    n = len(sorted_numbers)
-    
-    # محاسبه میانه
-    median = calculate_median(sorted_numbers)
-    
-    # محاسبه چارک‌ها بر اساس روش دقیق
-    if n % 2 == 1:  # تعداد فرد
-        median_pos = n // 2
-        lower_half = sorted_numbers[:median_pos]
-        upper_half = sorted_numbers[median_pos + 1:]
-    else:  # تعداد زوج
-        mid_pos1 = n // 2 - 1
-        mid_pos2 = n // 2
-        lower_half = sorted_numbers[:mid_pos2]  # شامل اولین عدد میانی
-        upper_half = sorted_numbers[mid_pos1 + 1:]  # شامل دومین عدد میانی
-    
-    q1 = calculate_median(lower_half)
-    q3 = calculate_median(upper_half)
-    
-    iqr = q3 - q1
-    lower_bound = q1 - 1.5 * iqr
-    upper_bound = q3 + 1.5 * iqr
-    
-    outliers = [x for x in sorted_numbers if x < lower_bound or x > upper_bound]
-    
-    return {
-        'sorted': sorted_numbers,
-        'min': float(np.min(numbers)),
-        'q1': float(q1),
-        'median': float(median),
-        'q3': float(q3),
-        'max': float(np.max(numbers)),
-        'iqr': float(iqr),
-        'lower_bound': float(lower_bound),
-        'upper_bound': float(upper_bound),
-        'outliers': outliers,
-        'count': n,
-        'mean': float(np.mean(numbers)),
-        'std': float(np.std(numbers)),
-        'lower_half': lower_half,
-        'upper_half': upper_half,
-        'is_even': (n % 2 == 0)
-    }
+def format_values(values, edge_items=10):
+    """نمایش فشرده یک آرایه؛ برای آرایه‌های بزرگ فقط ابتدا و انتهای آن"""
+    return np.array2string(
+        np.asarray(values), separator=', ', threshold=2 * edge_items, edgeitems=edge_items,
+        max_line_width=1_000_000
+    )
 
 # رابط کاربری
 def main():
@@ -148,7 +99,7 @@ def main():
             ["✍️ وارد کردن دستی", "📁 آپلود فایل", "📋 استفاده از مثال"]
         )
         
-        numbers = []
+        numbers = np.empty(0)
         
         if input_method == "✍️ وارد کردن دستی":
             input_text = st.text_area(
@@ -158,32 +109,49 @@ def main():
             )
             
             if input_text:
-                items = input_text.replace(',', ' ').split()
-                numbers = []
-                for item in items:
-                    try:
-                        numbers.append(float(item))
-                    except:
-                        pass
+                # تبدیل برداری کل متن (ارقام فارسی و «٫» هم پذیرفته می‌شوند)
+                numbers, invalid_items = parse_numbers(input_text)
+                
+                if invalid_items:
+                    shown = ', '.join(f"{item} (#{pos})" for pos, item in invalid_items[:20])
+                    more = f" و {len(invalid_items) - 20} مورد دیگر" if len(invalid_items) > 20 else ""
+                    st.warning(f"موارد نامعتبر نادیده گرفته شدند: {shown}{more}")
         
         elif input_method == "📁 آپلود فایل":
             uploaded_file = st.file_uploader("فایل CSV یا Excel آپلود کنید", type=['csv', 'xlsx'])
             
             if uploaded_file:
                 try:
+                    # فقط چند سطر اول برای پیش‌نمایش خوانده می‌شود
                     if uploaded_file.name.endswith('.csv'):
-                        df = pd.read_csv(uploaded_file)
+                        # تشخیص سرستون فقط پیش‌فرض است (مثلاً سرستون‌های عددی مانند 101,102)
+                        sep, header = sniff_csv_format(uploaded_file)
+                        has_header = st.checkbox("سطر اول سرستون است", value=header == 'infer')
+                        header = 'infer' if has_header else None
+                        preview = read_csv_header(uploaded_file, header=header, sep=sep)
                     else:
-                        df = pd.read_excel(uploaded_file)
+                        sheets = list_excel_sheets(uploaded_file)
+                        sheet = sheets[0]
+                        if len(sheets) > 1:
+                            sheet = st.selectbox("برگه مورد نظر:", sheets)
+                        preview = read_excel_header(uploaded_file, sheet)
                     
                     st.write("پیش‌نمایش داده‌ها:")
-                    st.dataframe(df.head())
+                    st.dataframe(preview.head())
                     
-                    if len(df.columns) > 1:
-                        col = st.selectbox("ستون مورد نظر:", df.columns)
-                        numbers = df[col].dropna().astype(float).tolist()
-                    else:
-                        numbers = df.iloc[:, 0].dropna().astype(float).tolist()
+                    # پیش‌فرض: اولین ستون عددی پیش‌نمایش
+                    columns = list(preview.columns)
+                    numeric_columns = list(preview.select_dtypes('number').columns)
+                    col = numeric_columns[0] if numeric_columns else columns[0]
+                    if len(columns) > 1:
+                        col = st.selectbox("ستون مورد نظر:", columns, index=columns.index(col))
+                    
+                    # خواندن جریانی ستون انتخاب‌شده فقط هنگام محاسبه
+                    if st.session_state.get('calculate', False):
+                        if uploaded_file.name.endswith('.csv'):
+                            numbers = read_csv_column(uploaded_file, col, header=header, sep=sep)
+                        else:
+                            numbers = read_excel_column(uploaded_file, col, sheet)
                 except Exception as e:
                     st.error(f"خطا: {e}")
         
@@ -202,18 +170,21 @@ def main():
             
             st.write(f"داده‌ها: {numbers}")
     
+    # مرتب‌سازی کامل داده‌ها فقط برای نمایش نیمه‌ها در جزئیات و فقط در صورت درخواست
+    show_halves = st.checkbox("نمایش نیمه‌های مرتب‌شده در جزئیات", value=False)
+    
     # دکمه محاسبه
-    calculate_btn = st.button("🚀 محاسبه آمار", type="primary", use_container_width=True)
+    calculate_btn = st.button("🚀 محاسبه آمار", type="primary", use_container_width=True, key='calculate')
     
     st.markdown('</div>', unsafe_allow_html=True)
     
     # محاسبه و نمایش نتایج
-    if calculate_btn and numbers:
+    if calculate_btn and len(numbers) > 0:
         if len(numbers) < 3:
             st.error("⚠️ حداقل ۳ عدد وارد کنید!")
         else:
             with st.spinner("در حال محاسبه..."):
-                stats = calculate_iqr_statistics(numbers)
+                stats = cached_iqr_statistics(numbers, method='tukey')
             
             if stats:
                 # نمایش نتایج در کارت‌ها
@@ -244,14 +215,8 @@ def main():
                 tab1, tab2, tab3 = st.tabs(["📈 Boxplot", "📊 هیستوگرام", "🔍 جزئیات"])
                 
                 with tab1:
-                    fig = go.Figure()
-                    fig.add_trace(go.Box(
-                        y=numbers,
-                        name='داده‌ها',
-                        boxpoints='outliers',
-                        marker_color='#1E88E5',
-                        line_color='#0D47A1'
-                    ))
+                    # نمودار از روی آمار محاسبه‌شده، بدون ارسال همه داده‌ها
+                    fig = boxplot_figure(stats)
                     fig.update_layout(
                         title="نمودار جعبه‌ای (Boxplot)",
                         yaxis_title="مقدار",
@@ -260,11 +225,13 @@ def main():
                     st.plotly_chart(fig, use_container_width=True)
                 
                 with tab2:
-                    fig_hist = px.histogram(
-                        x=numbers,
-                        nbins=20,
+                    # دسته‌بندی در سرور؛ فقط لبه‌ها و شمارش‌ها ارسال می‌شوند
+                    counts, edges = cached_histogram(numbers, stats, rule='fixed', bins=20)
+                    fig_hist = histogram_figure(counts, edges)
+                    fig_hist.update_layout(
                         title="توزیع داده‌ها",
-                        labels={'x': 'مقدار', 'y': 'تعداد'}
+                        xaxis_title="مقدار",
+                        yaxis_title="تعداد"
                     )
                     fig_hist.add_vline(x=stats['q1'], line_dash="dash", line_color="green")
                     fig_hist.add_vline(x=stats['median'], line_dash="dash", line_color="red")
@@ -274,20 +241,27 @@ def main():
                 with tab3:
                     st.write("**جزئیات محاسبات:**")
                     st.write(f"- حالت: {'زوج' if stats['is_even'] else 'فرد'}")
-                    st.write(f"- نیمه پایینی: {stats['lower_half']}")
-                    st.write(f"- نیمه بالایی: {stats['upper_half']}")
+                    if show_halves:
+                        # نیمه‌ها نماهایی روی همان آرایه مرتب‌شده هستند؛ در نمایش فقط ابتدا و انتها چاپ می‌شود
+                        sorted_numbers = np.sort(numbers)
+                        half = stats['count'] // 2
+                        st.write(f"- نیمه پایینی: {format_values(sorted_numbers[:half])}")
+                        st.write(f"- نیمه بالایی: {format_values(sorted_numbers[stats['count'] - half:])}")
                     st.write(f"- مرز پایین outlier: {stats['lower_bound']:.2f}")
                     st.write(f"- مرز بالا outlier: {stats['upper_bound']:.2f}")
                     
-                    if stats['outliers']:
-                        st.warning(f"**داده‌های پرت ({len(stats['outliers'])} عدد):** {stats['outliers']}")
+                    if len(stats['outliers']):
+                        st.warning(f"**داده‌های پرت ({len(stats['outliers'])} عدد):** {format_values(stats['outliers'])}")
                     else:
                         st.success("**هیچ داده پرتی وجود ندارد**")
                 
                 # خروجی CSV
                 st.download_button(
                     label="📥 دانلود نتایج (CSV)",
-                    data=pd.DataFrame([stats]).to_csv(index=False).encode('utf-8-sig'),
+                    data=pd.DataFrame([{
+                        **{k: v for k, v in stats.items() if k not in ('outlier_table', 'outliers', 'digest')},
+                        'outliers': stats['outliers'].tolist()
+                    }]).to_csv(index=False).encode('utf-8-sig'),
                     file_name="iqr_results.csv",
                     mime="text/csv"
                 )
@@ -4,12 +4,29 @@
 نسخه بهینه‌شده برای اجرای سریع در وب
 """
 
+import functools
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from io import StringIO
+
+import iqr_stats
+from iqr_stats import top_outliers
+from iqr_diagnostics import StageTimer
+from iqr_diskcache import cache_key, default_disk_cache, file_digest
+from iqr_export import EXPORT_MIME_TYPES, available_export_formats, export_bytes, sorted_slice
+from iqr_charts import (
+    boxplot_figure, grouped_boxplot_figure, histogram_figure, outlier_scatter_figure,
+    rolling_outlier_figure
+)
+from iqr_ingest import (
+    collect_chunks, iter_csv_column, iter_excel_column, list_excel_sheets, normalize_number_text,
+    parse_numbers, read_csv_columns, read_csv_grouped, read_csv_header, read_excel_columns, read_excel_grouped,
+    read_excel_header, sniff_csv_format
+)
+from iqr_incremental import IncrementalIQR, appended_suffix
+from iqr_rolling import rolling_iqr
+from iqr_sketch import approximate_iqr_statistics, sketch_from_chunks
 
 # تنظیمات صفحه
 st.set_page_config(
@@ -57,11 +74,25 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def warn_invalid_items(invalid_items, limit=20):
+    """هشدار موارد نامعتبر همراه با شماره هر مورد (حداکثر limit مورد)"""
+    shown = ', '.join(f"{item} (#{pos})" for pos, item in invalid_items[:limit])
+    more = f" و {len(invalid_items) - limit} مورد دیگر" if len(invalid_items) > limit else ""
+    st.warning(f"موارد نامعتبر نادیده گرفته شدند: {shown}{more}")
+
 # تیتر اصلی
 st.markdown('<h1 class="main-header">📊 محاسبه‌گر دامنه میان‌چارکی (IQR)</h1>', unsafe_allow_html=True)
 
 # سایدبار برای ورودی داده‌ها
 with st.sidebar:
+    # ابزار عیب‌یابی عملکرد (پیش از همه مراحل تا خواندن داده هم اندازه‌گیری شود)
+    with st.expander("🩺 عیب‌یابی عملکرد", expanded=False):
+        timer = StageTimer(
+            enabled=st.checkbox("اندازه‌گیری زمان مراحل", value=False),
+            track_memory=st.checkbox("اندازه‌گیری حافظه (کندتر)", value=False),
+            log=st.checkbox("ثبت در لاگ (JSON)", value=False)
+        )
+    
     st.header("📥 روش ورود داده‌ها")
     
     input_method = st.radio(
@@ -70,7 +101,20 @@ with st.sidebar:
         index=0
     )
     
-    numbers = []
+    # ذخیره فشرده: داده‌ها با float32 نگه داشته می‌شوند (نصف حافظه، دقت حدود ۷ رقم)
+    storage_dtype = np.float32 if st.checkbox("ذخیره فشرده داده‌ها (float32)", value=False) else np.float64
+    
+    numbers = np.empty(0, dtype=storage_dtype)
+    sketch = None
+    batch_matrix = None
+    group_labels = None
+    frequency = None
+    incremental_engine = None
+    # کلید کش دیسکی برای ستون خوانده‌شده از فایل (در صورت فعال بودن IQR_CACHE_DIR)
+    disk_cache = default_disk_cache()
+    data_key = None
+    # دکمه محاسبه پایین سایدبار است؛ وضعیت آن از پیش در session_state موجود است
+    calculate_requested = st.session_state.get('calculate', False)
     
     if input_method == "✍️ وارد کردن دستی":
         st.subheader("ورود دستی اعداد")
@@ -80,23 +124,36 @@ with st.sidebar:
             height=100
         )
         
-        if input_text:
-            # پردازش ورودی
-            cleaned_text = input_text.replace(',', ' ').replace('\n', ' ')
-            items = cleaned_text.split()
+        # حالت افزایشی: فقط مقادیر اضافه‌شده به انتهای متن پردازش و درج می‌شوند
+        incremental = st.checkbox("حالت افزایشی (ورود زنده داده‌ها)", value=False)
+        
+        if input_text and incremental:
+            state = st.session_state.get('incremental')
+            new_text = appended_suffix(state['text'], input_text) if state else None
+            if new_text is None:
+                state = {'text': '', 'engine': IncrementalIQR(method='linear'), 'tokens': 0, 'invalid': []}
+                new_text = input_text
+            
+            new_numbers, new_invalid = timer.call('parse', parse_numbers, new_text)
+            state['engine'].extend(new_numbers)
+            # شماره موارد نامعتبر نسبت به بخش جدید است؛ با تعداد توکن‌های قبلی به کل متن منتقل می‌شود
+            state['invalid'].extend((state['tokens'] + pos, item) for pos, item in new_invalid)
+            state['tokens'] += len(normalize_number_text(new_text).split())
+            state['text'] = input_text
+            st.session_state['incremental'] = state
             
-            numbers = []
-            invalid_items = []
+            incremental_engine = state['engine']
+            numbers = incremental_engine.values
             
-            for item in items:
-                try:
-                    num = float(item)
-                    numbers.append(num)
-                except ValueError:
-                    invalid_items.append(item)
+            if state['invalid']:
+                warn_invalid_items(state['invalid'])
+        
+        elif input_text:
+            # پردازش برداری ورودی (ارقام فارسی/عربی و «٫» هم پذیرفته می‌شوند)
+            numbers, invalid_items = timer.call('parse', parse_numbers, input_text)
             
             if invalid_items:
-                st.warning(f"موارد نامعتبر نادیده گرفته شدند: {', '.join(invalid_items)}")
+                warn_invalid_items(invalid_items)
     
     elif input_method == "📁 آپلود فایل":
         st.subheader("آپلود فایل")
@@ -107,24 +164,102 @@ with st.sidebar:
         
         if uploaded_file is not None:
             try:
-                if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
-                elif uploaded_file.name.endswith('.xlsx'):
-                    df = pd.read_excel(uploaded_file)
-                else:  # txt file
-                    content = uploaded_file.read().decode('utf-8')
-                    df = pd.read_csv(StringIO(content), header=None)
+                if uploaded_file.name.endswith('.xlsx'):
+                    # فقط نام برگه‌ها و چند سطر اول خوانده می‌شود؛ ستون انتخابی بعداً جریانی استخراج می‌شود
+                    sheets = list_excel_sheets(uploaded_file)
+                    sheet = sheets[0]
+                    if len(sheets) > 1:
+                        sheet = st.selectbox("برگه مورد نظر را انتخاب کنید:", sheets)
+                    preview = timer.call('ingest:preview', read_excel_header, uploaded_file, sheet)
+                    read_options = {'sheet': sheet}
+                else:
+                    # جداکننده و سرستون از نمونه ابتدای فایل تشخیص داده می‌شود؛ سرستون قابل تغییر است
+                    # (سطر اول تمام‌عددی مانند شناسه کانال‌ها 101,102 ممکن است سرستون باشد)
+                    sep, header = timer.call('ingest:sniff', sniff_csv_format, uploaded_file)
+                    has_header = st.checkbox("سطر اول سرستون است", value=header == 'infer')
+                    header = 'infer' if has_header else None
+                    preview = timer.call('ingest:preview', read_csv_header, uploaded_file, header=header, sep=sep)
+                    read_options = {'header': header, 'sep': sep}
+                is_excel = 'sheet' in read_options
                 
                 # نمایش پیش‌نمایش داده
                 st.write("پیش‌نمایش داده‌ها:")
-                st.dataframe(df.head(), use_container_width=True)
+                st.dataframe(preview.head(), use_container_width=True)
+                
+                # ستون‌های عددی از روی سطرهای پیش‌نمایش پیشنهاد می‌شوند
+                numeric_columns = list(preview.select_dtypes('number').columns)
+                if not numeric_columns:
+                    st.warning("در سطرهای ابتدایی فایل ستون عددی یافت نشد")
                 
-                # انتخاب ستون
-                if len(df.columns) > 1:
-                    column = st.selectbox("ستون مورد نظر را انتخاب کنید:", df.columns)
-                    numbers = df[column].dropna().astype(float).tolist()
+                # خواندن کامل فایل فقط پس از انتخاب ستون و زدن دکمه محاسبه انجام می‌شود
+                if not calculate_requested:
+                    st.caption("ستون انتخاب‌شده هنگام محاسبه خوانده می‌شود")
+                
+                # حالت دسته‌ای: همه ستون‌های عددی در یک ماتریس
+                if len(numeric_columns) > 1 and st.checkbox("تحلیل همه ستون‌های عددی (دسته‌ای)"):
+                    batch_columns = numeric_columns
+                    if calculate_requested:
+                        read_columns = read_excel_columns if is_excel else read_csv_columns
+                        batch_matrix = timer.call('ingest', read_columns, uploaded_file, numeric_columns, **read_options)
                 else:
-                    numbers = df.iloc[:, 0].dropna().astype(float).tolist()
+                    # انتخاب ستون (پیش‌فرض: اولین ستون عددی) و خواندن جریانی فقط همان ستون
+                    columns = list(preview.columns)
+                    column = numeric_columns[0] if numeric_columns else columns[0]
+                    if len(columns) > 1:
+                        column = st.selectbox(
+                            "ستون مورد نظر را انتخاب کنید:",
+                            columns,
+                            index=columns.index(column),
+                            format_func=lambda c: f"{c} 🔢" if c in numeric_columns else str(c)
+                        )
+                    
+                    # جدول فراوانی: ستون تعداد/وزن اختیاری (هر سطر یک مقدار و تعداد تکرار یا وزن آن)
+                    count_candidates = [c for c in numeric_columns if c != column]
+                    count_column = None
+                    if count_candidates:
+                        count_column = st.selectbox(
+                            "ستون تعداد/وزن (اختیاری):",
+                            [None] + count_candidates,
+                            format_func=lambda c: "— هر سطر یک داده —" if c is None else str(c),
+                            help="تعدادهای صحیح نتیجه‌ای دقیقاً برابر با داده‌های بازشده می‌دهند؛ "
+                                 "وزن‌های اعشاری با چندک وزنی (نقاط میانی جرم تجمعی) محاسبه می‌شوند"
+                        )
+                    
+                    # گروه‌بندی اختیاری بر اساس یک ستون دسته‌ای
+                    other_columns = [c for c in columns if c != column]
+                    group_column = None
+                    if other_columns and count_column is None:
+                        group_column = st.selectbox(
+                            "گروه‌بندی بر اساس ستون (اختیاری):",
+                            [None] + other_columns,
+                            format_func=lambda c: "— بدون گروه‌بندی —" if c is None else str(c)
+                        )
+                    
+                    # حالت تقریبی: اسکچ با حافظه ثابت به جای نگه داشتن همه مقادیر
+                    approximate = group_column is None and count_column is None and st.checkbox("حالت تقریبی (اسکچ KLL با حافظه ثابت)", value=False)
+                    if calculate_requested:
+                        iter_column = iter_excel_column if is_excel else iter_csv_column
+                        if count_column is not None:
+                            read_columns = read_excel_columns if is_excel else read_csv_columns
+                            frequency = timer.call('ingest', read_columns, uploaded_file, [column, count_column], **read_options)
+                        elif group_column is not None:
+                            read_grouped = read_excel_grouped if is_excel else read_csv_grouped
+                            numbers, group_labels = timer.call('ingest', read_grouped, uploaded_file, column, group_column, **read_options)
+                        elif approximate:
+                            sketch = timer.call('ingest', sketch_from_chunks, iter_column(uploaded_file, column, **read_options))
+                        else:
+                            # فایل تکراری (حتی پس از راه‌اندازی مجدد یا در replica دیگر) دوباره خوانده نمی‌شود
+                            cached = None
+                            if disk_cache is not None:
+                                digest = timer.call('ingest:digest', file_digest, uploaded_file)
+                                data_key = cache_key(digest, column, read_options, np.dtype(storage_dtype).str)
+                                cached = timer.call('ingest:disk_cache', disk_cache.get_array, data_key)
+                            if cached is not None:
+                                numbers = cached
+                            else:
+                                numbers = timer.call('ingest', collect_chunks, iter_column(uploaded_file, column, **read_options), dtype=storage_dtype)
+                                if data_key is not None:
+                                    timer.call('ingest:disk_cache', disk_cache.put_array, data_key, numbers)
                     
             except Exception as e:
                 st.error(f"خطا در خواندن فایل: {e}")
@@ -140,273 +275,313 @@ with st.sidebar:
         if distribution == "نرمال":
             mean = st.slider("میانگین:", -100.0, 100.0, 50.0)
             std = st.slider("انحراف معیار:", 0.1, 50.0, 15.0)
-            numbers = np.random.normal(mean, std, num_points).tolist()
+            numbers = np.random.normal(mean, std, num_points)
         elif distribution == "یکنواخت":
             low = st.slider("حد پایین:", -100.0, 100.0, 0.0)
             high = st.slider("حد بالا:", -100.0, 100.0, 100.0)
-            numbers = np.random.uniform(low, high, num_points).tolist()
+            numbers = np.random.uniform(low, high, num_points)
         else:  # نمایی
             scale = st.slider("مقیاس:", 0.1, 20.0, 5.0)
-            numbers = np.random.exponential(scale, num_points).tolist()
-    
-    # دکمه محاسبه
-    calculate_btn = st.button("🚀 محاسبه آمار", type="primary", use_container_width=True)
-
-# توابع محاسباتی بهینه‌شده
-@st.cache_data(show_spinner=False)
-def calculate_iqr_statistics(_numbers):
-    """محاسبه سریع آمار IQR با استفاده از numpy"""
-    if len(_numbers) < 3:
-        return None
-    
-    arr = np.array(_numbers)
-    sorted_arr = np.sort(arr)
+            numbers = np.random.exponential(scale, num_points)
     
-    # محاسبه چارک‌ها با numpy
-    q1 = np.percentile(arr, 25)
-    median = np.median(arr)
-    q3 = np.percentile(arr, 75)
-    iqr = q3 - q1
+    # داده‌ها در کل مسیر یک آرایه پیوسته با نوع انتخاب‌شده هستند (حالت افزایشی float64 می‌ماند)
+    if incremental_engine is None:
+        numbers = numbers.astype(storage_dtype, copy=False)
     
-    # مرزهای outlier
-    lower_bound = q1 - 1.5 * iqr
-    upper_bound = q3 + 1.5 * iqr
+    # تنظیمات نمایش
+    hist_rules = {
+        "تعداد ثابت (۳۰ دسته)": 'fixed',
+        "فریدمن-دیاکونیس (بر اساس IQR)": 'fd',
+        "استرجس": 'sturges',
+    }
+    hist_rule = hist_rules[st.selectbox("قاعده دسته‌بندی هیستوگرام:", list(hist_rules))]
     
-    # شناسایی outliers
-    outliers = arr[(arr < lower_bound) | (arr > upper_bound)]
+    # مرزهای متحرک برای داده‌های دارای ترتیب زمانی
+    rolling_window = None
+    if st.checkbox("مرزهای متحرک (پنجره لغزان)", value=False):
+        rolling_window = st.number_input("اندازه پنجره:", min_value=3, max_value=100000, value=50, step=1)
     
-    return {
-        'sorted': sorted_arr,
-        'min': float(np.min(arr)),
-        'q1': float(q1),
-        'median': float(median),
-        'q3': float(q3),
-        'max': float(np.max(arr)),
-        'iqr': float(iqr),
-        'lower_bound': float(lower_bound),
-        'upper_bound': float(upper_bound),
-        'outliers': outliers.tolist(),
-        'count': len(arr),
-        'mean': float(np.mean(arr)),
-        'std': float(np.std(arr)),
-        'variance': float(np.var(arr))
-    }
+    # دکمه محاسبه
+    calculate_btn = st.button("🚀 محاسبه آمار", type="primary", use_container_width=True, key='calculate')
 
-# نمایش نتایج
-if calculate_btn and numbers:
-    if len(numbers) < 3:
-        st.error("⚠️ حداقل ۳ عدد وارد کنید!")
+# حداکثر تعداد سطرهای جدول outliers در صفحه
+OUTLIER_REPORT_LIMIT = 1000
+
+# تعداد سطرهای هر صفحه در نمایش داده‌های مرتب‌شده
+SORTED_PAGE_SIZE = 1000
+
+# توابع محاسباتی بهینه‌شده
+def calculate_iqr_statistics(numbers):
+    """محاسبه سریع آمار IQR با موتور انتخاب جزئی (درون‌یابی خطی) و کش بر اساس محتوا"""
+    return iqr_stats.cached_iqr_statistics(numbers, method='linear')
+
+# رندر بخشی نتایج: تعامل با یک بخش فقط همان بخش را دوباره اجرا می‌کند،
+# بدون خواندن دوباره ورودی یا محاسبه دوباره آمار (در نسخه‌های قدیمی‌تر، اجرای عادی)
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+# دانلود با داده تابعی (ساخت فایل فقط هنگام کلیک): پارامتر data در download_button از Streamlit 1.52
+DEFERRED_DOWNLOADS = tuple(int(part) for part in st.__version__.split('.')[:2]) >= (1, 52)
+
+RESULT_TABS = ["📈 آمار توصیفی", "📊 نمودارها", "🔍 داده‌های پرت", "📥 خروجی داده"]
+
+def memo(results, key, build):
+    """ساخت نمودار/خروجی فقط یک بار برای هر نتیجه؛ اجراهای بعدی از نسخه ذخیره‌شده استفاده می‌کنند"""
+    artifacts = results.setdefault('artifacts', {})
+    if key not in artifacts:
+        artifacts[key] = build()
+    return artifacts[key]
+
+def render_diagnostics():
+    """پنل عیب‌یابی: زمان و حافظه هر مرحله در این اجرا"""
+    if not (timer.enabled and timer.records):
+        return
+    with st.expander(f"🩺 زمان‌بندی مراحل ({timer.total_seconds * 1000:.1f} میلی‌ثانیه)", expanded=False):
+        diagnostics_df = pd.DataFrame(timer.records)
+        diagnostics_df['seconds'] = diagnostics_df['seconds'] * 1000
+        diagnostics_df = diagnostics_df.rename(columns={'stage': 'مرحله', 'seconds': 'زمان (ms)', 'peak_bytes': 'اوج حافظه (بایت)'})
+        st.dataframe(diagnostics_df, use_container_width=True, hide_index=True)
+        st.download_button(
+            label="📥 دانلود زمان‌بندی (JSON)",
+            data=timer.to_json().encode('utf-8'),
+            file_name="iqr_diagnostics.json",
+            mime="application/json"
+        )
+
+def results_fragment(render):
+    """
+    بخش نتایج در یک fragment همراه با پنل عیب‌یابی؛ در اجرای جزئی (مثلاً تعویض بخش)
+    فقط رکوردهای اجرای جزئی قبلی حذف می‌شوند و مراحل خواندن و محاسبه در پنل می‌مانند
+    """
+    @fragment
+    @functools.wraps(render)
+    def run():
+        timer.rewind(results_checkpoint)
+        render()
+        render_diagnostics()
+    return run
+
+def render_summary_tab(stats):
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.markdown('<div class="result-box">', unsafe_allow_html=True)
+        st.metric("تعداد داده‌ها", f"{stats['count']:,}")
+        st.metric("میانگین", f"{stats['mean']:.4f}")
+        st.metric("انحراف معیار", f"{stats['std']:.4f}")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown('<div class="result-box">', unsafe_allow_html=True)
+        st.metric("کمینه (MIN)", f"{stats['min']:.4f}")
+        st.metric("چارک اول (Q1)", f"{stats['q1']:.4f}")
+        st.metric("میانه (MED)", f"{stats['median']:.4f}")
+        st.metric("چارک سوم (Q3)", f"{stats['q3']:.4f}")
+        st.metric("بیشینه (MAX)", f"{stats['max']:.4f}")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col3:
+        st.markdown('<div class="result-box">', unsafe_allow_html=True)
+        st.metric("دامنه میان‌چارکی (IQR)", f"{stats['iqr']:.4f}")
+        st.metric("مرز پایین outlier", f"{stats['lower_bound']:.4f}")
+        st.metric("مرز بالا outlier", f"{stats['upper_bound']:.4f}")
+        st.metric("واریانس", f"{stats['variance']:.4f}")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+def build_box_figure(stats):
+    # نمودار Boxplot از روی آمار محاسبه‌شده (فقط نقاط پرت ارسال می‌شوند)
+    fig_box = timer.call('chart:box', boxplot_figure, stats)
+    fig_box.update_layout(
+        title="نمودار جعبه‌ای (Boxplot)",
+        yaxis_title="مقدار",
+        showlegend=False,
+        template="plotly_white",
+        height=400
+    )
+    return fig_box
+
+def build_histogram_figure(numbers, stats, rule):
+    # دسته‌بندی در سرور؛ شمارش‌ها همراه آمار کش می‌شوند
+    counts, edges = timer.call('chart:histogram', iqr_stats.cached_histogram, numbers, stats, rule=rule, bins=30)
+    fig_hist = histogram_figure(counts, edges)
+    fig_hist.update_layout(
+        title="توزیع داده‌ها (هیستوگرام)",
+        xaxis_title="مقدار",
+        yaxis_title="تعداد"
+    )
+
+    # اضافه کردن خطوط چارک‌ها
+    fig_hist.add_vline(x=stats['q1'], line_dash="dash", line_color="green",
+                     annotation_text=f"Q1: {stats['q1']:.2f}")
+    fig_hist.add_vline(x=stats['median'], line_dash="dash", line_color="red",
+                     annotation_text=f"Median: {stats['median']:.2f}")
+    fig_hist.add_vline(x=stats['q3'], line_dash="dash", line_color="green",
+                     annotation_text=f"Q3: {stats['q3']:.2f}")
+
+    fig_hist.update_layout(height=400, showlegend=False)
+    return fig_hist
+
+def build_scatter_figure(numbers, stats, window):
+    caption = None
+    if window is not None:
+        # مرزهای محلی روی پنجره لغزان به جای مرزهای سراسری
+        rolling = timer.call('compute:rolling', rolling_iqr, numbers, window=window, method='linear')
+        fig_scatter = timer.call('chart:scatter', rolling_outlier_figure, rolling)
+        caption = f"{rolling['outlier_count']:,} داده پرت محلی با پنجره {window:,} داده‌ای"
     else:
-        # محاسبه آمار
-        with st.spinner("در حال محاسبه..."):
-            stats = calculate_iqr_statistics(numbers)
-        
-        if stats:
-            # ایجاد تب‌های مختلف
-            tab1, tab2, tab3, tab4 = st.tabs(["📈 آمار توصیفی", "📊 نمودارها", "🔍 داده‌های پرت", "📥 خروجی داده"])
-            
-            with tab1:
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.markdown('<div class="result-box">', unsafe_allow_html=True)
-                    st.metric("تعداد داده‌ها", f"{stats['count']:,}")
-                    st.metric("میانگین", f"{stats['mean']:.4f}")
-                    st.metric("انحراف معیار", f"{stats['std']:.4f}")
-                    st.markdown('</div>', unsafe_allow_html=True)
-                
-                with col2:
-                    st.markdown('<div class="result-box">', unsafe_allow_html=True)
-                    st.metric("کمینه (MIN)", f"{stats['min']:.4f}")
-                    st.metric("چارک اول (Q1)", f"{stats['q1']:.4f}")
-                    st.metric("میانه (MED)", f"{stats['median']:.4f}")
-                    st.metric("چارک سوم (Q3)", f"{stats['q3']:.4f}")
-                    st.metric("بیشینه (MAX)", f"{stats['max']:.4f}")
-                    st.markdown('</div>', unsafe_allow_html=True)
-                
-                with col3:
-                    st.markdown('<div class="result-box">', unsafe_allow_html=True)
-                    st.metric("دامنه میان‌چارکی (IQR)", f"{stats['iqr']:.4f}")
-                    st.metric("مرز پایین outlier", f"{stats['lower_bound']:.4f}")
-                    st.metric("مرز بالا outlier", f"{stats['upper_bound']:.4f}")
-                    st.metric("واریانس", f"{stats['variance']:.4f}")
-                    st.markdown('</div>', unsafe_allow_html=True)
-            
-            with tab2:
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # نمودار Boxplot با Plotly
-                    fig_box = go.Figure()
-                    
-                    fig_box.add_trace(go.Box(
-                        y=numbers,
-                        name='داده‌ها',
-                        boxpoints='outliers',
-                        marker_color='#1E88E5',
-                        line_color='#0D47A1'
-                    ))
-                    
-                    fig_box.update_layout(
-                        title="نمودار جعبه‌ای (Boxplot)",
-                        yaxis_title="مقدار",
-                        showlegend=False,
-                        template="plotly_white",
-                        height=400
-                    )
-                    
-                    st.plotly_chart(fig_box, use_container_width=True)
-                
-                with col2:
-                    # هیستوگرام
-                    fig_hist = px.histogram(
-                        x=numbers,
-                        nbins=30,
-                        title="توزیع داده‌ها (هیستوگرام)",
-                        labels={'x': 'مقدار', 'y': 'تعداد'}
-                    )
-                    
-                    # اضافه کردن خطوط چارک‌ها
-                    fig_hist.add_vline(x=stats['q1'], line_dash="dash", line_color="green", 
-                                     annotation_text=f"Q1: {stats['q1']:.2f}")
-                    fig_hist.add_vline(x=stats['median'], line_dash="dash", line_color="red", 
-                                     annotation_text=f"Median: {stats['median']:.2f}")
-                    fig_hist.add_vline(x=stats['q3'], line_dash="dash", line_color="green", 
-                                     annotation_text=f"Q3: {stats['q3']:.2f}")
-                    
-                    fig_hist.update_layout(height=400, showlegend=False)
-                    st.plotly_chart(fig_hist, use_container_width=True)
-                
-                # نمودار پراکندگی
-                st.subheader("نمودار پراکندگی و مرزهای Outlier")
-                fig_scatter = go.Figure()
-                
-                # داده‌های عادی
-                normal_data = [x for x in numbers if stats['lower_bound'] <= x <= stats['upper_bound']]
-                indices_normal = [i for i, x in enumerate(numbers) if stats['lower_bound'] <= x <= stats['upper_bound']]
-                
-                # داده‌های پرت
-                outlier_indices = [i for i, x in enumerate(numbers) if x < stats['lower_bound'] or x > stats['upper_bound']]
-                
-                if normal_data:
-                    fig_scatter.add_trace(go.Scatter(
-                        x=indices_normal,
-                        y=normal_data,
-                        mode='markers',
-                        name='داده‌های عادی',
-                        marker=dict(color='blue', size=8)
-                    ))
-                
-                if stats['outliers']:
-                    fig_scatter.add_trace(go.Scatter(
-                        x=outlier_indices,
-                        y=stats['outliers'],
-                        mode='markers',
-                        name='داده‌های پرت',
-                        marker=dict(color='red', size=10, symbol='x')
-                    ))
-                
-                # خطوط مرزی
-                fig_scatter.add_hline(y=stats['lower_bound'], line_dash="dash", 
-                                    line_color="orange", annotation_text="مرز پایین")
-                fig_scatter.add_hline(y=stats['upper_bound'], line_dash="dash", 
-                                    line_color="orange", annotation_text="مرز بالا")
-                
-                fig_scatter.update_layout(
-                    title="شناسایی داده‌های پرت",
-                    xaxis_title="شماره داده",
-                    yaxis_title="مقدار",
-                    height=400,
-                    template="plotly_white"
-                )
-                
-                st.plotly_chart(fig_scatter, use_container_width=True)
-            
-            with tab3:
-                if stats['outliers']:
-                    st.markdown('<div class="outlier-box">', unsafe_allow_html=True)
-                    st.subheader(f"🚨 {len(stats['outliers'])} داده پرت شناسایی شد")
-                    
-                    # نمایش جدول outliers
-                    outliers_df = pd.DataFrame({
-                        'ردیف': range(1, len(stats['outliers']) + 1),
-                        'مقدار': stats['outliers'],
-                        'نوع': ['پایین‌تر از مرز' if x < stats['lower_bound'] else 'بالاتر از مرز' for x in stats['outliers']],
-                        'انحراف از مرز': [abs(x - stats['lower_bound']) if x < stats['lower_bound'] else abs(x - stats['upper_bound']) for x in stats['outliers']]
-                    })
-                    
-                    st.dataframe(outliers_df, use_container_width=True, hide_index=True)
-                    
-                    # خلاصه outliers
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric("تعداد کل outliers", len(stats['outliers']))
-                        st.metric("درصد outliers", f"{(len(stats['outliers'])/len(numbers))*100:.2f}%")
-                    
-                    with col2:
-                        if stats['outliers']:
-                            st.metric("کوچکترین outlier", f"{min(stats['outliers']):.4f}")
-                            st.metric("بزرگترین outlier", f"{max(stats['outliers']):.4f}")
-                    
-                    st.markdown('</div>', unsafe_allow_html=True)
-                else:
-                    st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                    st.success("✅ هیچ داده پرتی شناسایی نشد!")
-                    st.markdown('</div>', unsafe_allow_html=True)
-            
-            with tab4:
-                st.subheader("📤 خروجی داده‌ها و نتایج")
-                
-                # ایجاد DataFrame از نتایج
-                results_df = pd.DataFrame([{
-                    'کمینه (MIN)': stats['min'],
-                    'چارک اول (Q1)': stats['q1'],
-                    'میانه (MED)': stats['median'],
-                    'چارک سوم (Q3)': stats['q3'],
-                    'بیشینه (MAX)': stats['max'],
-                    'IQR': stats['iqr'],
-                    'میانگین': stats['mean'],
-                    'انحراف معیار': stats['std']
-                }])
-                
-                st.write("نتایج آماری:")
-                st.dataframe(results_df, use_container_width=True)
-                
-                # داده‌های مرتب‌شده
-                st.write("داده‌های مرتب‌شده:")
-                sorted_df = pd.DataFrame({
-                    'ردیف': range(1, len(stats['sorted']) + 1),
-                    'مقدار': stats['sorted']
-                })
-                st.dataframe(sorted_df, use_container_width=True, height=300)
-                
-                # دکمه‌های دانلود
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    # دانلود نتایج به صورت CSV
-                    csv_results = results_df.to_csv(index=False).encode('utf-8-sig')
-                    st.download_button(
-                        label="📥 دانلود نتایج (CSV)",
-                        data=csv_results,
-                        file_name="iqr_results.csv",
-                        mime="text/csv"
-                    )
-                
-                with col2:
-                    # دانلود داده‌های مرتب‌شده
-                    csv_sorted = sorted_df.to_csv(index=False).encode('utf-8-sig')
-                    st.download_button(
-                        label="📥 دانلود داده‌ها (CSV)",
-                        data=csv_sorted,
-                        file_name="sorted_data.csv",
-                        mime="text/csv"
-                    )
-                
-                with col3:
-                    # کپی نتایج
-                    if st.button("📋 کپی نتایج به کلیپ‌برد"):
-                        result_text = f"""
+        # داده‌های عادی کاهش‌یافته با WebGL؛ همه داده‌های پرت حفظ می‌شوند
+        fig_scatter = timer.call('chart:scatter', outlier_scatter_figure, numbers, stats)
+
+    fig_scatter.update_layout(
+        title="شناسایی داده‌های پرت",
+        xaxis_title="شماره داده",
+        yaxis_title="مقدار",
+        height=400,
+        template="plotly_white"
+    )
+    return fig_scatter, caption
+
+def render_charts_tab(results):
+    stats, numbers = results['stats'], results['numbers']
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fig_box = memo(results, 'box', lambda: build_box_figure(stats))
+        timer.call('chart:box:render', st.plotly_chart, fig_box, use_container_width=True)
+
+    with col2:
+        # هیستوگرام
+        fig_hist = memo(results, ('histogram', hist_rule), lambda: build_histogram_figure(numbers, stats, hist_rule))
+        timer.call('chart:histogram:render', st.plotly_chart, fig_hist, use_container_width=True)
+
+    # نمودار پراکندگی
+    st.subheader("نمودار پراکندگی و مرزهای Outlier")
+    window = int(rolling_window) if rolling_window is not None else None
+    fig_scatter, caption = memo(results, ('scatter', window), lambda: build_scatter_figure(numbers, stats, window))
+    if caption:
+        st.caption(caption)
+
+    scatter_meta = fig_scatter.layout.meta
+    if scatter_meta['normal_shown'] < scatter_meta['normal_total']:
+        st.caption(
+            f"نمایش {scatter_meta['normal_shown']:,} از {scatter_meta['normal_total']:,} "
+            "داده عادی (کاهش با حفظ کمینه/بیشینه)"
+        )
+
+    timer.call('chart:scatter:render', st.plotly_chart, fig_scatter, use_container_width=True)
+
+def outliers_frame(rows):
+    return pd.DataFrame({
+        'ردیف': np.arange(1, len(rows) + 1),
+        'شماره داده': rows['index'],
+        'مقدار': rows['value'],
+        'نوع': np.where(rows['side'] < 0, 'پایین‌تر از مرز', 'بالاتر از مرز'),
+        'انحراف از مرز': rows['distance']
+    })
+
+def render_outliers_tab(results):
+    stats = results['stats']
+    if len(stats['outliers']):
+        st.markdown('<div class="outlier-box">', unsafe_allow_html=True)
+        st.subheader(f"🚨 {len(stats['outliers'])} داده پرت شناسایی شد")
+
+        # جدول outliers از آرایه ساختاریافته موتور (بدون حلقه پایتونی)
+        table = stats['outlier_table']
+        report = top_outliers(table, k=OUTLIER_REPORT_LIMIT)
+
+        if len(report) < len(table):
+            st.caption(f"نمایش {len(report):,} داده پرت شدیدتر از {len(table):,} مورد؛ فهرست کامل از دکمه دانلود")
+        st.dataframe(outliers_frame(report), use_container_width=True, hide_index=True)
+
+        st.download_button(
+            label="📥 دانلود همه داده‌های پرت (CSV)",
+            data=memo(results, 'outliers_csv', lambda: timer.call('download:outliers', lambda: outliers_frame(top_outliers(table)).to_csv(index=False).encode('utf-8-sig'))),
+            file_name="outliers.csv",
+            mime="text/csv"
+        )
+
+        # خلاصه outliers
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("تعداد کل outliers", len(table))
+            st.metric("درصد outliers", f"{(len(table) / stats['count']) * 100:.2f}%")
+
+        with col2:
+            st.metric("کوچکترین outlier", f"{table['value'].min():.4f}")
+            st.metric("بزرگترین outlier", f"{table['value'].max():.4f}")
+
+        st.markdown('</div>', unsafe_allow_html=True)
+    else:
+        st.markdown('<div class="success-box">', unsafe_allow_html=True)
+        st.success("✅ هیچ داده پرتی شناسایی نشد!")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+def render_export_tab(results):
+    stats, numbers = results['stats'], results['numbers']
+    st.subheader("📤 خروجی داده‌ها و نتایج")
+
+    # ایجاد DataFrame از نتایج
+    results_df = pd.DataFrame([{
+        'کمینه (MIN)': stats['min'],
+        'چارک اول (Q1)': stats['q1'],
+        'میانه (MED)': stats['median'],
+        'چارک سوم (Q3)': stats['q3'],
+        'بیشینه (MAX)': stats['max'],
+        'IQR': stats['iqr'],
+        'میانگین': stats['mean'],
+        'انحراف معیار': stats['std']
+    }])
+
+    st.write("نتایج آماری:")
+    st.dataframe(results_df, use_container_width=True)
+
+    # داده‌های مرتب‌شده: فقط سطرهای صفحه جاری با انتخاب جزئی مرتب می‌شوند و
+    # هیچ نسخه مرتب‌شده کاملی در session_state نگه داشته نمی‌شود
+    st.write("داده‌های مرتب‌شده:")
+    page_count = max(1, -(-len(numbers) // SORTED_PAGE_SIZE))
+    page = st.number_input(f"صفحه (از {page_count:,}):", min_value=1, max_value=page_count, value=1, step=1)
+    start = (int(page) - 1) * SORTED_PAGE_SIZE
+    page_values = sorted_slice(numbers, start, start + SORTED_PAGE_SIZE)
+    st.dataframe(pd.DataFrame({
+        'ردیف': np.arange(start + 1, start + len(page_values) + 1),
+        'مقدار': page_values
+    }), use_container_width=True, height=300, hide_index=True)
+    st.caption(f"سطرهای {start + 1:,} تا {start + len(page_values):,} از {len(numbers):,}")
+
+    # دکمه‌های دانلود
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        # دانلود نتایج به صورت CSV
+        csv_results = timer.call('download:results', lambda: results_df.to_csv(index=False).encode('utf-8-sig'))
+        st.download_button(
+            label="📥 دانلود نتایج (CSV)",
+            data=csv_results,
+            file_name="iqr_results.csv",
+            mime="text/csv"
+        )
+
+    with col2:
+        # دانلود داده‌های مرتب‌شده: فایل فقط هنگام درخواست ساخته و در session_state ذخیره نمی‌شود
+        export_format = st.selectbox("قالب فایل داده‌ها:", available_export_formats(), format_func=str.upper)
+        build_export = lambda: timer.call('download:sorted', export_bytes, np.sort(numbers), export_format)
+        export_data = None
+        if DEFERRED_DOWNLOADS:
+            export_data = build_export
+        elif st.button("⚙️ آماده‌سازی فایل داده‌ها"):
+            # در نسخه‌های قدیمی‌تر بایت‌ها فقط در همین اجرا نگه داشته می‌شوند
+            export_data = build_export()
+        if export_data is not None:
+            st.download_button(
+                label=f"📥 دانلود داده‌ها ({export_format.upper()})",
+                data=export_data,
+                file_name=f"sorted_data.{export_format}",
+                mime=EXPORT_MIME_TYPES[export_format]
+            )
+
+    with col3:
+        # کپی نتایج
+        if st.button("📋 کپی نتایج به کلیپ‌برد"):
+            result_text = f"""
 نتایج محاسبه IQR:
 تعداد داده‌ها: {stats['count']}
 کمینه: {stats['min']:.4f}
@@ -416,9 +591,269 @@ if calculate_btn and numbers:
 بیشینه: {stats['max']:.4f}
 IQR: {stats['iqr']:.4f}
 تعداد outliers: {len(stats['outliers'])}
-                        """
-                        st.code(result_text, language="text")
-                        st.success("نتایج آماده کپی هستند!")
+            """
+            st.code(result_text, language="text")
+            st.success("نتایج آماده کپی هستند!")
+
+@results_fragment
+def render_stats_results():
+    # فقط بخش انتخاب‌شده ساخته می‌شود؛ بخش‌های دیگر تا زمان انتخاب اجرا نمی‌شوند
+    results = st.session_state['results']
+    tab = st.radio("بخش نتایج", RESULT_TABS, horizontal=True, key='result_tab', label_visibility="collapsed")
+
+    if tab == RESULT_TABS[0]:
+        render_summary_tab(results['stats'])
+    elif tab == RESULT_TABS[1]:
+        render_charts_tab(results)
+    elif tab == RESULT_TABS[2]:
+        render_outliers_tab(results)
+    else:
+        render_export_tab(results)
+
+@results_fragment
+def render_grouped_results():
+    results = st.session_state['results']
+    grouped = results['grouped']
+    groups_df = memo(results, 'groups_df', lambda: pd.DataFrame({
+        'گروه': grouped['groups'],
+        'تعداد داده‌ها': grouped['count'],
+        'کمینه (MIN)': grouped['min'],
+        'چارک اول (Q1)': grouped['q1'],
+        'میانه (MED)': grouped['median'],
+        'چارک سوم (Q3)': grouped['q3'],
+        'بیشینه (MAX)': grouped['max'],
+        'IQR': grouped['iqr'],
+        'مرز پایین': grouped['lower_bound'],
+        'مرز بالا': grouped['upper_bound'],
+        'تعداد outliers': grouped['outlier_count'],
+        'میانگین': grouped['mean'],
+        'انحراف معیار': grouped['std']
+    }).sort_values('تعداد outliers', ascending=False, kind='stable'))
+
+    st.subheader(f"🗂️ آمار IQR برای {len(grouped['groups']):,} گروه")
+
+    # نمودار جعبه‌ای چندگانه از آمار گروهی
+    def build_groups_figure():
+        fig_groups = timer.call('chart:groups', grouped_boxplot_figure, grouped)
+        fig_groups.update_layout(
+            title="نمودار جعبه‌ای گروه‌ها",
+            yaxis_title="مقدار",
+            showlegend=False,
+            template="plotly_white",
+            height=500
+        )
+        return fig_groups
+
+    fig_groups = memo(results, 'groups', build_groups_figure)
+    groups_meta = fig_groups.layout.meta
+    if groups_meta['groups_shown'] < groups_meta['groups_total']:
+        st.caption(f"نمایش {groups_meta['groups_shown']:,} گروه پرجمعیت‌تر از {groups_meta['groups_total']:,} گروه")
+    timer.call('chart:groups:render', st.plotly_chart, fig_groups, use_container_width=True)
+
+    st.dataframe(groups_df, use_container_width=True, hide_index=True)
+    st.download_button(
+        label="📥 دانلود آمار گروه‌ها (CSV)",
+        data=memo(results, 'groups_csv', lambda: timer.call('download:groups', lambda: groups_df.to_csv(index=False).encode('utf-8-sig'))),
+        file_name="iqr_groups_summary.csv",
+        mime="text/csv"
+    )
+
+@results_fragment
+def render_approximate_results():
+    results = st.session_state['results']
+    approx = results['approx']
+    st.info(
+        f"📐 نتایج تقریبی با اسکچ KLL (k={results['k']}) — "
+        f"خطای رتبه هر چارک حداکثر ±{approx['rank_error'] * 100:.2f}٪"
+    )
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.markdown('<div class="result-box">', unsafe_allow_html=True)
+        st.metric("تعداد داده‌ها", f"{approx['count']:,}")
+        st.metric("میانگین", f"{approx['mean']:.4f}")
+        st.metric("انحراف معیار", f"{approx['std']:.4f}")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown('<div class="result-box">', unsafe_allow_html=True)
+        st.metric("کمینه (MIN)", f"{approx['min']:.4f}")
+        st.metric("چارک اول (Q1)", f"{approx['q1']:.4f}")
+        st.metric("میانه (MED)", f"{approx['median']:.4f}")
+        st.metric("چارک سوم (Q3)", f"{approx['q3']:.4f}")
+        st.metric("بیشینه (MAX)", f"{approx['max']:.4f}")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col3:
+        st.markdown('<div class="result-box">', unsafe_allow_html=True)
+        st.metric("دامنه میان‌چارکی (IQR)", f"{approx['iqr']:.4f}")
+        st.metric("مرز پایین outlier", f"{approx['lower_bound']:.4f}")
+        st.metric("مرز بالا outlier", f"{approx['upper_bound']:.4f}")
+        st.metric(
+            "تعداد تقریبی outliers",
+            f"{approx['outlier_count']:,} ± {approx['outlier_count_error']:,}"
+        )
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # Boxplot تقریبی از روی چارک‌های اسکچ
+    def build_approx_box():
+        fig_box = timer.call('chart:box', boxplot_figure, approx)
+        fig_box.update_layout(
+            title="نمودار جعبه‌ای تقریبی (Boxplot)",
+            yaxis_title="مقدار",
+            showlegend=False,
+            template="plotly_white",
+            height=400
+        )
+        return fig_box
+
+    timer.call('chart:box:render', st.plotly_chart, memo(results, 'box', build_approx_box), use_container_width=True)
+
+@results_fragment
+def render_batch_results():
+    results = st.session_state['results']
+    batch, columns = results['batch'], results['columns']
+    summary_df = memo(results, 'summary_df', lambda: pd.DataFrame({
+        'ستون': columns,
+        'تعداد داده‌ها': batch['count'],
+        'کمینه (MIN)': batch['min'],
+        'چارک اول (Q1)': batch['q1'],
+        'میانه (MED)': batch['median'],
+        'چارک سوم (Q3)': batch['q3'],
+        'بیشینه (MAX)': batch['max'],
+        'IQR': batch['iqr'],
+        'مرز پایین': batch['lower_bound'],
+        'مرز بالا': batch['upper_bound'],
+        'outliers پایین': batch['low_outliers'],
+        'outliers بالا': batch['high_outliers'],
+        'تعداد outliers': batch['outlier_count'],
+        'میانگین': batch['mean'],
+        'انحراف معیار': batch['std']
+    }).sort_values('تعداد outliers', ascending=False, kind='stable'))
+
+    st.subheader(f"📋 خلاصه IQR برای {len(columns)} ستون عددی")
+    st.dataframe(summary_df, use_container_width=True, hide_index=True)
+
+    st.download_button(
+        label="📥 دانلود خلاصه ستون‌ها (CSV)",
+        data=memo(results, 'summary_csv', lambda: timer.call('download:summary', lambda: summary_df.to_csv(index=False).encode('utf-8-sig'))),
+        file_name="iqr_columns_summary.csv",
+        mime="text/csv"
+    )
+
+def frequency_outliers_frame(rows):
+    return pd.DataFrame({
+        'مقدار': rows['value'],
+        'تعداد': rows['count'],
+        'نوع': np.where(rows['side'] < 0, 'پایین‌تر از مرز', 'بالاتر از مرز'),
+        'انحراف از مرز': rows['distance']
+    })
+
+@results_fragment
+def render_frequency_results():
+    results = st.session_state['results']
+    stats = results['stats']
+    if stats['weighted']:
+        st.info(f"📑 جدول وزنی با {stats['distinct']:,} مقدار متمایز و مجموع وزن {stats['count']:,.4f}")
+    else:
+        st.info(f"📑 جدول فراوانی با {stats['distinct']:,} مقدار متمایز و {stats['count']:,} داده")
+
+    render_summary_tab(stats)
+
+    fig_box = memo(results, 'box', lambda: build_box_figure(stats))
+    timer.call('chart:box:render', st.plotly_chart, fig_box, use_container_width=True)
+
+    table = stats['outlier_table']
+    if len(table):
+        st.markdown('<div class="outlier-box">', unsafe_allow_html=True)
+        amount = f"وزن {stats['outlier_count']:,.4f}" if stats['weighted'] else f"{stats['outlier_count']:,} داده"
+        st.subheader(f"🚨 {amount} پرت در {len(table):,} مقدار متمایز")
+        report = top_outliers(table, k=OUTLIER_REPORT_LIMIT)
+        if len(report) < len(table):
+            st.caption(f"نمایش {len(report):,} مقدار پرت شدیدتر از {len(table):,} مورد؛ فهرست کامل از دکمه دانلود")
+        st.dataframe(frequency_outliers_frame(report), use_container_width=True, hide_index=True)
+        st.metric("درصد outliers", f"{(stats['outlier_count'] / stats['count']) * 100:.2f}%")
+        st.download_button(
+            label="📥 دانلود مقادیر پرت (CSV)",
+            data=memo(results, 'outliers_csv', lambda: timer.call('download:outliers', lambda: frequency_outliers_frame(top_outliers(table)).to_csv(index=False).encode('utf-8-sig'))),
+            file_name="outliers.csv",
+            mime="text/csv"
+        )
+        st.markdown('</div>', unsafe_allow_html=True)
+    else:
+        st.success("✅ هیچ داده پرتی شناسایی نشد!")
+
+RESULT_RENDERERS = {
+    'stats': render_stats_results,
+    'grouped': render_grouped_results,
+    'approximate': render_approximate_results,
+    'batch': render_batch_results,
+    'frequency': render_frequency_results,
+}
+
+# محاسبه فقط با دکمه انجام می‌شود؛ نتیجه در session_state می‌ماند تا اجراهای بعدی از آن استفاده کنند
+if calculate_btn:
+    st.session_state['results'] = None
+
+    if group_labels is not None:
+        with st.spinner("در حال محاسبه گروه‌ها..."):
+            grouped = timer.call('compute', iqr_stats.grouped_iqr_statistics, numbers, group_labels, method='linear')
+
+        if grouped is None:
+            st.error("⚠️ داده عددی معتبری یافت نشد!")
+        else:
+            st.session_state['results'] = {'kind': 'grouped', 'grouped': grouped}
+
+    elif frequency is not None:
+        try:
+            stats = timer.call('compute', iqr_stats.frequency_iqr_statistics, frequency[:, 0], frequency[:, 1], method='linear')
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+        else:
+            if stats is None:
+                st.error("⚠️ مجموع تعدادها باید حداقل ۳ باشد!")
+            else:
+                st.session_state['results'] = {'kind': 'frequency', 'stats': stats}
+
+    elif len(numbers) > 0:
+        if len(numbers) < 3:
+            st.error("⚠️ حداقل ۳ عدد وارد کنید!")
+        else:
+            # محاسبه آمار
+            with st.spinner("در حال محاسبه..."):
+                if incremental_engine is not None:
+                    stats = timer.call('compute', incremental_engine.statistics)
+                elif data_key is not None:
+                    stats_key = cache_key(data_key, 'linear', 1.5)
+                    stats = timer.call('compute:disk_cache', disk_cache.get_stats, stats_key)
+                    if stats is None:
+                        stats = timer.call('compute', calculate_iqr_statistics, numbers)
+                        timer.call('compute:disk_cache', disk_cache.put_stats, stats_key, stats)
+                else:
+                    stats = timer.call('compute', calculate_iqr_statistics, numbers)
+
+            st.session_state['results'] = {'kind': 'stats', 'stats': stats, 'numbers': numbers}
+
+    elif sketch is not None:
+        approx = timer.call('compute', approximate_iqr_statistics, sketch)
+
+        if approx is None:
+            st.error("⚠️ حداقل ۳ عدد وارد کنید!")
+        else:
+            st.session_state['results'] = {'kind': 'approximate', 'approx': approx, 'k': sketch.k}
+
+    elif batch_matrix is not None:
+        with st.spinner("در حال محاسبه همه ستون‌ها..."):
+            batch = timer.call('compute', iqr_stats.batch_iqr_statistics, batch_matrix, method='linear')
+
+        st.session_state['results'] = {'kind': 'batch', 'batch': batch, 'columns': batch_columns}
+
+# نمایش نتایج
+results = st.session_state.get('results')
+if results is not None:
+    results_checkpoint = timer.checkpoint()
+    RESULT_RENDERERS[results['kind']]()
 
 elif not calculate_btn:
     st.info("👈 لطفاً از سایدبار داده‌ها را وارد کرده و دکمه محاسبه را بزنید.")
@@ -450,6 +885,10 @@ elif not calculate_btn:
         در این مثال، ۱۰۰ یک outlier محسوب می‌شود.
         """)
 
+# پنل عیب‌یابی بدون نتیجه (مثلاً فقط خواندن داده)؛ با نتیجه، درون بخش نتایج رسم می‌شود
+if results is None:
+    render_diagnostics()
+
 # فوتر
 st.markdown("---")
 st.markdown(
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+بنچمارک قابل تکرار پیاده‌سازی‌های آمار IQR در اندازه‌های مختلف ورودی
+
+مراحل اندازه‌گیری‌شده: تجزیه متن، محاسبه آمار (روش دقیق و درون‌یابی خطی،
+به همراه پیاده‌سازی‌های قدیمی app.py و app_1.py برای مقایسه)، ساخت داده نمودارها و اوج حافظه
+
+مثال:
+    python benchmarks/bench_iqr.py --sizes 1e3,1e5,1e6 -o bench.json
+    python benchmarks/bench_iqr.py --baseline bench.json --threshold 0.25
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iqr_ingest import parse_numbers  # noqa: E402
+from iqr_stats import calculate_iqr_statistics, compute_histogram  # noqa: E402
+
+# پیاده‌سازی‌های قدیمی فقط تا این اندازه اجرا می‌شوند (مرتب‌سازی پایتونی کند است)
+LEGACY_MAX_SIZE = 1_000_000
+# تجزیه متن فقط تا این اندازه (متن 1e8 عدد چند گیگابایت است)
+PARSE_MAX_SIZE = 10_000_000
+
+
+# مولدهای داده: همان توزیع‌های app_1.py به علاوه ورودی‌های بدحالت
+def _normal(rng, n):
+    return rng.normal(50.0, 15.0, n)
+
+
+def _uniform(rng, n):
+    return rng.uniform(0.0, 100.0, n)
+
+
+def _exponential(rng, n):
+    return rng.exponential(5.0, n)
+
+
+def _all_equal(rng, n):
+    return np.full(n, 42.0)
+
+
+def _heavy_ties(rng, n):
+    return rng.integers(0, 10, n).astype(np.float64)
+
+
+def _with_nans(rng, n):
+    data = rng.normal(50.0, 15.0, n)
+    data[rng.random(n) < 0.1] = np.nan
+    return data
+
+
+def _with_infinities(rng, n):
+    # مقادیر ±inf معتبرند (parse_numbers آن‌ها را می‌پذیرد) و نباید هیستوگرام را از کار بیندازند
+    data = rng.normal(50.0, 15.0, n)
+    data[rng.random(n) < 0.01] = np.inf
+    data[0] = -np.inf
+    return data
+
+
+GENERATORS = {
+    'normal': _normal,
+    'uniform': _uniform,
+    'exponential': _exponential,
+    'all_equal': _all_equal,
+    'heavy_ties': _heavy_ties,
+    'nans': _with_nans,
+    'infinities': _with_infinities,
+}
+
+
+# پیاده‌سازی‌های نسخه اولیه برای مقایسه
+def _legacy_median(data):
+    n = len(data)
+    sorted_data = sorted(data)
+    if n % 2 == 1:
+        return sorted_data[n // 2]
+    return (sorted_data[n // 2 - 1] + sorted_data[n // 2]) / 2
+
+
+def legacy_app_statistics(numbers):
+    """روش دقیق نسخه اولیه app.py (مرتب‌سازی‌های پایتونی تکراری)"""
+    sorted_numbers = sorted(numbers)
+    n = len(sorted_numbers)
+    median = _legacy_median(sorted_numbers)
+    if n % 2 == 1:
+        lower_half = sorted_numbers[:n // 2]
+        upper_half = sorted_numbers[n // 2 + 1:]
+    else:
+        lower_half = sorted_numbers[:n // 2]
+        upper_half = sorted_numbers[n // 2:]
+    q1 = _legacy_median(lower_half)
+    q3 = _legacy_median(upper_half)
+    iqr = q3 - q1
+    outliers = [x for x in sorted_numbers if x < q1 - 1.5 * iqr or x > q3 + 1.5 * iqr]
+    return q1, median, q3, outliers
+
+
+def legacy_app_1_statistics(numbers):
+    """نسخه اولیه app_1.py (np.sort به همراه np.percentile و np.median جداگانه)"""
+    arr = np.array(numbers)
+    np.sort(arr)
+    q1 = np.percentile(arr, 25)
+    median = np.median(arr)
+    q3 = np.percentile(arr, 75)
+    iqr = q3 - q1
+    outliers = arr[(arr < q1 - 1.5 * iqr) | (arr > q3 + 1.5 * iqr)]
+    return q1, median, q3, outliers.tolist()
+
+
+def _measure(func, repeat):
+    """بهترین زمان از چند تکرار و اوج حافظه یک اجرا (tracemalloc)"""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def _chart_payload(data, stats):
+    from iqr_charts import boxplot_figure, histogram_figure, outlier_scatter_figure
+
+    counts, edges = compute_histogram(data, stats, 'fd')
+    figures = (boxplot_figure(stats), histogram_figure(counts, edges),
+               outlier_scatter_figure(data, stats))
+    return sum(len(fig.to_json()) for fig in figures)
+
+
+def run_case(generator, n, repeat, seed, legacy, charts):
+    rng = np.random.default_rng(seed)
+    data = GENERATORS[generator](rng, n)
+    clean = data[~np.isnan(data)]
+    stages = {}
+
+    def record(stage, func):
+        seconds, peak = _measure(func, repeat)
+        stages[stage] = {'seconds': seconds, 'peak_bytes': peak}
+
+    if n <= PARSE_MAX_SIZE:
+        text = ' '.join(map(repr, clean.tolist()))
+        record('parse', lambda: parse_numbers(text))
+        del text
+
+    record('compute_tukey', lambda: calculate_iqr_statistics(data, 'tukey'))
+    record('compute_linear', lambda: calculate_iqr_statistics(data, 'linear'))
+
+    if legacy and n <= LEGACY_MAX_SIZE:
+        as_list = clean.tolist()
+        record('legacy_app', lambda: legacy_app_statistics(as_list))
+        record('legacy_app_1', lambda: legacy_app_1_statistics(as_list))
+
+    if charts:
+        stats = calculate_iqr_statistics(data, 'tukey')
+        if stats is not None:
+            record('chart_payload', lambda: _chart_payload(clean, stats))
+            stages['chart_payload']['json_bytes'] = _chart_payload(clean, stats)
+
+    return {'generator': generator, 'n': n, 'stages': stages}
+
+
+def check_regressions(results, baseline, threshold):
+    """مقایسه زمان هر مرحله با baseline؛ خروجی لیست مراحلی که کندتر شده‌اند"""
+    reference = {
+        (case['generator'], case['n'], stage): values['seconds']
+        for case in baseline['results'] for stage, values in case['stages'].items()
+    }
+    regressions = []
+    for case in results:
+        for stage, values in case['stages'].items():
+            key = (case['generator'], case['n'], stage)
+            before = reference.get(key)
+            if before and values['seconds'] > before * (1 + threshold):
+                regressions.append({
+                    'generator': case['generator'],
+                    'n': case['n'],
+                    'stage': stage,
+                    'baseline_seconds': before,
+                    'seconds': values['seconds'],
+                    'ratio': values['seconds'] / before,
+                })
+    return regressions
+
+
+def _parse_sizes(text):
+    return [int(float(part)) for part in text.split(',') if part]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="بنچمارک محاسبه IQR")
+    parser.add_argument('--sizes', type=_parse_sizes, default=_parse_sizes('1e3,1e4,1e5,1e6'),
+                        help="اندازه‌ها با کاما، مثلاً 1e3,1e6,1e8")
+    parser.add_argument('--generators', default=','.join(GENERATORS),
+                        help="مولدها با کاما: " + ', '.join(GENERATORS))
+    parser.add_argument('--repeat', type=int, default=3, help="تعداد تکرار (بهترین زمان گزارش می‌شود)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-legacy', action='store_true', help="بدون پیاده‌سازی‌های قدیمی")
+    parser.add_argument('--no-charts', action='store_true', help="بدون ساخت داده نمودارها (plotly)")
+    parser.add_argument('--output', '-o', default='-', help="فایل JSON خروجی؛ «-» یعنی stdout")
+    parser.add_argument('--baseline', help="فایل JSON نتایج قبلی برای بررسی پسرفت")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="حداکثر کندی مجاز نسبت به baseline (0.2 یعنی ۲۰٪)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    generators = [name for name in args.generators.split(',') if name]
+
+    results = []
+    for n in args.sizes:
+        for generator in generators:
+            case = run_case(generator, n, args.repeat, args.seed,
+                            legacy=not args.no_legacy, charts=not args.no_charts)
+            results.append(case)
+            print(f"{generator} n={n:,}: " + ', '.join(
+                f"{stage}={values['seconds'] * 1000:.1f}ms" for stage, values in case['stages'].items()
+            ), file=sys.stderr)
+
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            report['regressions'] = check_regressions(results, json.load(f), args.threshold)
+        for item in report['regressions']:
+            print(f"پسرفت: {item['generator']} n={item['n']:,} {item['stage']} "
+                  f"{item['ratio']:.2f}x", file=sys.stderr)
+        status = 1 if report['regressions'] else 0
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+ساخت نمودارها از روی آمار محاسبه‌شده در سرور
+حجم داده ارسالی به مرورگر به تعداد outliers بستگی دارد، نه به تعداد کل داده‌ها
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+
+def boxplot_figure(stats, name='داده‌ها', marker_color='#1E88E5', line_color='#0D47A1'):
+    """
+    نمودار جعبه‌ای از چارک‌ها و مرزهای از پیش محاسبه‌شده
+    فقط نقاط پرت به صورت جداگانه رسم می‌شوند
+    """
+    # در حالت تقریبی سبیل‌ها به مرزها (محدود به کمینه/بیشینه) ختم می‌شوند
+    lower_whisker = stats.get('lower_whisker', max(stats['lower_bound'], stats['min']))
+    upper_whisker = stats.get('upper_whisker', min(stats['upper_bound'], stats['max']))
+
+    fig = go.Figure()
+    fig.add_trace(go.Box(
+        x=[name],
+        q1=[stats['q1']],
+        median=[stats['median']],
+        q3=[stats['q3']],
+        lowerfence=[lower_whisker],
+        upperfence=[upper_whisker],
+        mean=[stats['mean']],
+        name=name,
+        marker_color=marker_color,
+        line_color=line_color,
+        hoverinfo='y',
+    ))
+
+    outliers = np.asarray(stats.get('outliers', ()), dtype=np.float64)
+    if len(outliers):
+        fig.add_trace(go.Scatter(
+            x=np.full(len(outliers), name, dtype=object),
+            y=outliers,
+            mode='markers',
+            name='داده‌های پرت',
+            marker=dict(color=marker_color, size=6, symbol='circle-open'),
+            showlegend=False,
+        ))
+
+    return fig
+
+
+def histogram_figure(counts, edges, marker_color='#636EFA'):
+    """هیستوگرام از شمارش‌های محاسبه‌شده در سرور به صورت نمودار میله‌ای"""
+    edges = np.asarray(edges, dtype=np.float64)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color=marker_color,
+        customdata=np.column_stack((edges[:-1], edges[1:])),
+        hovertemplate='[%{customdata[0]:.4g}, %{customdata[1]:.4g}): %{y}<extra></extra>',
+    ))
+    fig.update_layout(bargap=0)
+    return fig
+
+
+def minmax_decimate(values, max_points):
+    """
+    کاهش نقاط با حفظ شکل سری: در هر دسته کمینه و بیشینه نگه داشته می‌شود
+    خروجی: اندیس‌های مرتب نقاط انتخاب‌شده
+    """
+    values = np.asarray(values)
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+
+    buckets = max(max_points // 2, 1)
+    size = int(np.ceil(n / buckets))
+    rows = int(np.ceil(n / size))
+    # دسته آخر با تکرار مقدار انتهایی پر می‌شود تا reshape ممکن باشد
+    padded = np.pad(values, (0, rows * size - n), mode='edge').reshape(rows, size)
+    offsets = np.arange(rows) * size
+    picks = np.concatenate((
+        offsets + padded.argmin(axis=1),
+        offsets + padded.argmax(axis=1),
+        [0, n - 1],
+    ))
+    return np.unique(np.minimum(picks, n - 1))
+
+
+def outlier_scatter_figure(numbers, stats, max_points=5000):
+    """
+    نمودار پراکندگی WebGL: داده‌های عادی کاهش‌یافته و همه داده‌های پرت به طور کامل
+    اندیس و مقدار داده‌های پرت از یک ماسک واحد به دست می‌آیند
+    """
+    # آرایه ورودی (float64 یا float32) بدون تبدیل استفاده می‌شود؛ فقط نقاط نمایشی کپی می‌شوند
+    arr = np.asarray(numbers)
+    if 'outlier_table' in stats:
+        outlier_idx = stats['outlier_table']['index']
+        outlier_mask = np.zeros(len(arr), dtype=bool)
+        outlier_mask[outlier_idx] = True
+    else:
+        outlier_mask = (arr < stats['lower_bound']) | (arr > stats['upper_bound'])
+        outlier_idx = np.flatnonzero(outlier_mask)
+
+    normal_idx = np.flatnonzero(~outlier_mask)
+    shown_idx = normal_idx[minmax_decimate(arr[normal_idx], max_points)]
+
+    fig = go.Figure()
+    if len(normal_idx):
+        fig.add_trace(go.Scattergl(
+            x=shown_idx,
+            y=arr[shown_idx],
+            mode='markers',
+            name='داده‌های عادی',
+            marker=dict(color='blue', size=8 if len(shown_idx) < 1000 else 4)
+        ))
+
+    if len(outlier_idx):
+        fig.add_trace(go.Scattergl(
+            x=outlier_idx,
+            y=arr[outlier_idx],
+            mode='markers',
+            name='داده‌های پرت',
+            marker=dict(color='red', size=10, symbol='x')
+        ))
+
+    # خطوط مرزی
+    fig.add_hline(y=stats['lower_bound'], line_dash="dash",
+                  line_color="orange", annotation_text="مرز پایین")
+    fig.add_hline(y=stats['upper_bound'], line_dash="dash",
+                  line_color="orange", annotation_text="مرز بالا")
+
+    fig.layout.meta = {'normal_total': len(normal_idx), 'normal_shown': len(shown_idx)}
+    return fig
+
+
+def grouped_boxplot_figure(grouped, max_groups=100, marker_color='#1E88E5', line_color='#0D47A1'):
+    """
+    نمودار جعبه‌ای چندگانه از آمار گروهی محاسبه‌شده
+    فقط max_groups گروه پرجمعیت‌تر (با حداقل ۳ داده) رسم می‌شوند
+    """
+    eligible = np.flatnonzero(~np.isnan(grouped['q1']))
+    order = eligible[np.argsort(-grouped['count'][eligible], kind='stable')][:max_groups]
+    labels = grouped['groups'][order].astype(str)
+
+    fig = go.Figure()
+    fig.add_trace(go.Box(
+        x=labels,
+        q1=grouped['q1'][order],
+        median=grouped['median'][order],
+        q3=grouped['q3'][order],
+        lowerfence=grouped['lower_whisker'][order],
+        upperfence=grouped['upper_whisker'][order],
+        mean=grouped['mean'][order],
+        name='داده‌ها',
+        marker_color=marker_color,
+        line_color=line_color,
+    ))
+
+    table = grouped['outlier_table']
+    position = np.full(len(grouped['groups']), -1)
+    position[order] = np.arange(len(order))
+    shown = table[position[table['group']] >= 0]
+    if len(shown):
+        fig.add_trace(go.Scatter(
+            x=labels[position[shown['group']]],
+            y=shown['value'],
+            mode='markers',
+            name='داده‌های پرت',
+            marker=dict(color=marker_color, size=6, symbol='circle-open'),
+            showlegend=False,
+        ))
+
+    fig.layout.meta = {'groups_total': len(eligible), 'groups_shown': len(order)}
+    return fig
+
+
+def rolling_outlier_figure(rolling, max_points=5000):
+    """
+    نمودار پراکندگی با نوار مرزهای متحرک؛ نقاط عادی و نوارها کاهش می‌یابند
+    ولی همه نقاط پرت حفظ می‌شوند
+    """
+    arr = rolling['values']
+    outlier_idx = np.flatnonzero(rolling['outlier_mask'])
+    normal_idx = np.flatnonzero(~rolling['outlier_mask'])
+    shown_idx = normal_idx[minmax_decimate(arr[normal_idx], max_points)]
+
+    # نوار مرزها با گام یکنواخت رسم می‌شود
+    step = max(int(np.ceil(len(arr) / max_points)), 1)
+    band_idx = np.arange(0, len(arr), step)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=band_idx,
+        y=rolling['upper_bound'][band_idx],
+        mode='lines',
+        name='مرز بالا (متحرک)',
+        line=dict(color='orange', dash='dash', width=1),
+    ))
+    fig.add_trace(go.Scattergl(
+        x=band_idx,
+        y=rolling['lower_bound'][band_idx],
+        mode='lines',
+        name='مرز پایین (متحرک)',
+        line=dict(color='orange', dash='dash', width=1),
+        fill='tonexty',
+        fillcolor='rgba(255, 165, 0, 0.1)',
+    ))
+
+    if len(normal_idx):
+        fig.add_trace(go.Scattergl(
+            x=shown_idx,
+            y=arr[shown_idx],
+            mode='markers',
+            name='داده‌های عادی',
+            marker=dict(color='blue', size=8 if len(shown_idx) < 1000 else 4)
+        ))
+
+    if len(outlier_idx):
+        fig.add_trace(go.Scattergl(
+            x=outlier_idx,
+            y=arr[outlier_idx],
+            mode='markers',
+            name='داده‌های پرت (محلی)',
+            marker=dict(color='red', size=10, symbol='x')
+        ))
+
+    fig.layout.meta = {'normal_total': len(normal_idx), 'normal_shown': len(shown_idx)}
+    return fig
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+خط فرمان محاسبه IQR بدون Streamlit
+ورودی: فایل‌های CSV/TXT/XLSX، پوشه‌ها یا stdin؛ خروجی: خلاصه JSON یا CSV
+فایل‌های متعدد به صورت موازی در یک process pool پردازش می‌شوند
+
+مثال:
+    python iqr_cli.py data.csv --column value --format csv
+    python iqr_cli.py exports/ --jobs 32 --format csv -o summary.csv
+    cat numbers.txt | python iqr_cli.py --method linear
+    python iqr_cli.py histogram.csv --column value --count-column count
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from iqr_stats import (
+    APPROXIMATE_FIELDS, QUARTILE_METHODS, SUMMARY_FIELDS, calculate_iqr_statistics,
+    frequency_iqr_statistics, summarize
+)
+
+
+def _csv_column(path, column, header, sep):
+    from iqr_ingest import read_csv_header
+
+    if column is None:
+        return read_csv_header(path, nrows=1, header=header, sep=sep).columns[0]
+    if header is None:
+        return int(column)
+    return column
+
+
+# پسوندهایی که هنگام دادن یک پوشه پردازش می‌شوند
+SOURCE_EXTENSIONS = ('.csv', '.txt', '.xlsx')
+
+# هر worker پس از این تعداد فایل بازسازی می‌شود تا حافظه آن محدود بماند
+# (پارامتر max_tasks_per_child از پایتون 3.11؛ در نسخه‌های قدیمی‌تر worker بازسازی نمی‌شود)
+MAX_TASKS_PER_CHILD = 16
+
+
+def _pool_options(workers):
+    options = {'max_workers': workers}
+    if sys.version_info >= (3, 11):
+        options['max_tasks_per_child'] = MAX_TASKS_PER_CHILD
+    return options
+
+
+def expand_sources(sources):
+    """جایگزینی پوشه‌ها با فایل‌های داده داخل آن‌ها (مرتب‌شده)"""
+    paths = []
+    for source in sources:
+        if source != '-' and os.path.isdir(source):
+            paths.extend(sorted(
+                os.path.join(source, name) for name in os.listdir(source)
+                if name.lower().endswith(SOURCE_EXTENSIONS)
+            ))
+        else:
+            paths.append(source)
+    return paths
+
+
+def iter_source_chunks(path, column=None, header='infer'):
+    """تکه‌های float64 یک منبع (فایل CSV/XLSX، فایل متنی یا stdin با «-»)"""
+    from iqr_ingest import iter_csv_column, parse_numbers, sniff_csv_format
+
+    if path != '-' and path.lower().endswith('.csv'):
+        # جداکننده از نمونه ابتدای فایل تشخیص داده می‌شود؛ سرستون با --no-header تعیین می‌شود
+        sep, _ = sniff_csv_format(path)
+        yield from iter_csv_column(path, _csv_column(path, column, header, sep), header=header, sep=sep)
+        return
+
+    if path.lower().endswith('.xlsx'):
+        from iqr_ingest import iter_excel_column, read_excel_header
+
+        if column is None:
+            column = 0 if header is None else read_excel_header(path, nrows=0).columns[0]
+        yield from iter_excel_column(path, column, header=header)
+        return
+
+    if path == '-':
+        text = sys.stdin.read()
+    else:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+    values, invalid = parse_numbers(text)
+    if invalid:
+        print(f"{path}: {len(invalid)} مورد نامعتبر نادیده گرفته شد", file=sys.stderr)
+    yield values
+
+
+def read_source_frequency(path, column, count_column, header='infer'):
+    """ستون‌های مقدار و تعداد/وزن یک فایل CSV/XLSX به صورت جدول فراوانی"""
+    from iqr_ingest import read_csv_columns, read_excel_columns, read_excel_header, sniff_csv_format
+
+    if header is None:
+        count_column = int(count_column)
+    lower = path.lower()
+    if lower.endswith('.csv'):
+        sep, _ = sniff_csv_format(path)
+        column = _csv_column(path, column, header, sep)
+        matrix = read_csv_columns(path, [column, count_column], header=header, sep=sep)
+    elif lower.endswith('.xlsx'):
+        if column is None:
+            column = 0 if header is None else read_excel_header(path, nrows=0).columns[0]
+        elif header is None:
+            column = int(column)
+        matrix = read_excel_columns(path, [column, count_column], header=header)
+    else:
+        raise ValueError("ستون تعداد فقط برای فایل‌های CSV/XLSX پشتیبانی می‌شود")
+    return matrix[:, 0], matrix[:, 1]
+
+
+def analyze_source(path, column=None, header='infer', method='tukey', multiplier=1.5,
+                   approximate=False, count_column=None):
+    """
+    خلاصه IQR یک منبع؛ در حالت تقریبی از اسکچ KLL استفاده می‌شود
+    با count_column هر سطر یک مقدار و تعداد تکرار یا وزن آن است (جدول فراوانی)
+    """
+    if count_column is not None:
+        values, counts = read_source_frequency(path, column, count_column, header)
+        stats = frequency_iqr_statistics(values, counts, method, multiplier)
+        if stats is None:
+            raise ValueError("حداقل ۳ عدد لازم است")
+        return summarize(stats)
+
+    chunks = iter_source_chunks(path, column, header)
+    if approximate:
+        from iqr_sketch import approximate_iqr_statistics, sketch_from_chunks
+
+        stats = approximate_iqr_statistics(sketch_from_chunks(chunks), multiplier)
+    else:
+        from iqr_ingest import collect_chunks
+
+        stats = calculate_iqr_statistics(collect_chunks(chunks), method, multiplier)
+
+    if stats is None:
+        raise ValueError("حداقل ۳ عدد لازم است")
+    return summarize(stats)
+
+
+def _analyze_task(path, options):
+    # اجرا در worker: هر خطا فقط همان فایل را تحت تأثیر قرار می‌دهد
+    try:
+        return {'source': path, **analyze_source(path, **options)}
+    except Exception as e:
+        return {'source': path, 'error': str(e)}
+
+
+def analyze_many(paths, jobs=None, progress=None, **options):
+    """
+    پردازش چند منبع؛ در صورت وجود بیش از یک فایل و jobs > 1 به صورت موازی
+    progress(انجام‌شده، کل، نتیجه) پس از هر فایل فراخوانی می‌شود
+    نتایج به ترتیب ورودی برگردانده می‌شوند
+    """
+    jobs = jobs or os.cpu_count() or 1
+    results = [None] * len(paths)
+    # stdin فقط در فرآیند اصلی قابل خواندن است
+    parallel = jobs > 1 and len(paths) > 1
+    local = [i for i, path in enumerate(paths) if path == '-' or not parallel]
+    remote = [i for i, path in enumerate(paths) if path != '-' and parallel]
+    done = 0
+
+    def record(i, result):
+        nonlocal done
+        results[i] = result
+        done += 1
+        if progress is not None:
+            progress(done, len(paths), result)
+
+    for i in local:
+        record(i, _analyze_task(paths[i], options))
+
+    if remote:
+        with ProcessPoolExecutor(**_pool_options(min(jobs, len(remote)))) as pool:
+            futures = {pool.submit(_analyze_task, paths[i], options): i for i in remote}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # مثلاً از کار افتادن worker به دلیل کمبود حافظه
+                    result = {'source': paths[i], 'error': str(e)}
+                record(i, result)
+
+    return results
+
+
+def _print_progress(done, total, result):
+    status = 'خطا' if 'error' in result else 'ok'
+    print(f"[{done}/{total}] {result['source']}: {status}", file=sys.stderr)
+
+
+def write_results(results, output, fmt):
+    if fmt == 'json':
+        json.dump(results, output, ensure_ascii=False, indent=2)
+        output.write('\n')
+        return
+    # ستون‌های کران خطا فقط وقتی اضافه می‌شوند که نتیجه‌ای تقریبی وجود داشته باشد
+    extra = APPROXIMATE_FIELDS if any(result.get('approximate') for result in results) else ()
+    writer = csv.DictWriter(output, fieldnames=('source',) + SUMMARY_FIELDS + extra + ('error',))
+    writer.writeheader()
+    writer.writerows(results)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="محاسبه آمار IQR و داده‌های پرت")
+    parser.add_argument('sources', nargs='*', default=['-'],
+                        help="فایل‌ها یا پوشه‌های CSV/TXT/XLSX؛ «-» یا بدون آرگومان یعنی stdin")
+    parser.add_argument('--column', help="نام ستون CSV (یا شماره آن با --no-header)")
+    parser.add_argument('--no-header', action='store_true', help="فایل CSV سرستون ندارد")
+    parser.add_argument('--method', choices=QUARTILE_METHODS, default='tukey')
+    parser.add_argument('--multiplier', type=float, default=1.5, help="ضریب مرزهای outlier")
+    parser.add_argument('--approximate', action='store_true',
+                        help="حالت تقریبی با اسکچ KLL (حافظه ثابت)")
+    parser.add_argument('--count-column',
+                        help="ستون تعداد تکرار یا وزن هر مقدار (ورودی جدول فراوانی CSV/XLSX)؛ "
+                             "وزن‌های اعشاری با چندک وزنی محاسبه می‌شوند")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="تعداد فرآیندهای موازی (پیش‌فرض: تعداد هسته‌ها)")
+    parser.add_argument('--quiet', '-q', action='store_true', help="بدون گزارش پیشرفت")
+    parser.add_argument('--format', choices=('json', 'csv'), default='json')
+    parser.add_argument('--output', '-o', default='-', help="فایل خروجی؛ «-» یعنی stdout")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    header = None if args.no_header else 'infer'
+
+    paths = expand_sources(args.sources)
+    results = analyze_many(
+        paths,
+        jobs=args.jobs,
+        progress=None if args.quiet or len(paths) == 1 else _print_progress,
+        column=args.column,
+        header=header,
+        method=args.method,
+        multiplier=args.multiplier,
+        approximate=args.approximate,
+        count_column=args.count_column,
+    )
+    for result in results:
+        if 'error' in result:
+            print(f"{result['source']}: خطا: {result['error']}", file=sys.stderr)
+    failed = any('error' in result for result in results)
+
+    if args.output == '-':
+        write_results(results, sys.stdout, args.format)
+    else:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            write_results(results, f, args.format)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+ابزار اندازه‌گیری زمان و حافظه هر مرحله (خواندن، تجزیه، محاسبه، نمودارها، دانلودها)
+در حالت غیرفعال تقریباً هیچ هزینه‌ای ندارد
+"""
+
+import contextlib
+import json
+import logging
+import time
+import tracemalloc
+
+logger = logging.getLogger('iqr')
+
+
+def configure_logger():
+    """
+    اطمینان از خروجی گرفتن لاگ‌های مراحل: اگر برای لاگر 'iqr' handler تنظیم نشده باشد
+    هر رکورد به صورت یک خط JSON در stderr نوشته می‌شود (هر تنظیم قبلی حفظ می‌شود)
+    """
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+
+_DISABLED = contextlib.nullcontext()
+
+
+class StageTimer:
+    """
+    ثبت زمان (و در صورت نیاز اوج حافظه با tracemalloc) برای هر مرحله
+    مراحل با stage() به صورت context manager یا با call() برای یک فراخوانی تکی اندازه‌گیری می‌شوند
+    """
+
+    def __init__(self, enabled=False, track_memory=False, log=False):
+        self.enabled = enabled
+        self.track_memory = track_memory
+        self.log = log
+        self.records = []
+        if log:
+            configure_logger()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return self._measure(name)
+
+    def call(self, name, func, *args, **kwargs):
+        if not self.enabled:
+            return func(*args, **kwargs)
+        with self._measure(name):
+            return func(*args, **kwargs)
+
+    @contextlib.contextmanager
+    def _measure(self, name):
+        started_tracing = False
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {'stage': name, 'seconds': time.perf_counter() - start}
+            if self.track_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                record['peak_bytes'] = max(peak - base, 0)
+                if started_tracing:
+                    tracemalloc.stop()
+            self.records.append(record)
+            if self.log:
+                logger.info(json.dumps({'event': 'iqr_stage', **record}, ensure_ascii=False))
+
+    def checkpoint(self):
+        """موقعیت فعلی فهرست رکوردها برای rewind"""
+        return len(self.records)
+
+    def rewind(self, checkpoint):
+        """حذف رکوردهای ثبت‌شده پس از checkpoint (مثلاً اجرای قبلی یک fragment)"""
+        del self.records[checkpoint:]
+
+    @property
+    def total_seconds(self):
+        return sum(record['seconds'] for record in self.records)
+
+    def to_json(self):
+        return json.dumps(
+            {'total_seconds': self.total_seconds, 'stages': self.records},
+            ensure_ascii=False,
+            indent=2,
+        )
@@ -0,0 +1,282 @@
+"""
+کش پایدار روی دیسک برای ستون‌های خوانده‌شده و نتایج آماری
+مشترک بین چند فرآیند (replicaهای Streamlit) و باقی‌مانده پس از راه‌اندازی مجدد
+
+ستون‌ها به صورت فایل .npy ذخیره و با memory-map باز می‌شوند؛ فهرست ورودی‌ها،
+زمان آخرین دسترسی و نتایج آماری در یک پایگاه SQLite (حالت WAL) نگه داشته می‌شوند
+نتایج بدون pickle ذخیره می‌شوند (آرایه‌ها در npz و مقادیر عددی در JSON) تا محتوای پوشه
+مشترک نتواند کدی را در فرآیندهای برنامه اجرا کند
+با تنظیم متغیر محیطی IQR_CACHE_DIR فعال می‌شود
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zipfile
+
+import numpy as np
+
+# پوشه کش و سقف حجم آن از متغیرهای محیطی خوانده می‌شوند
+CACHE_DIR_ENV = 'IQR_CACHE_DIR'
+CACHE_MAX_BYTES_ENV = 'IQR_CACHE_MAX_BYTES'
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+
+# اندازه بلوک‌های خواندن هنگام هش فایل
+DIGEST_BLOCKSIZE = 1 << 20
+
+# مدت انتظار برای قفل SQLite وقتی فرآیند دیگری در حال نوشتن است
+SQLITE_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    nbytes INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    payload BLOB,
+    PRIMARY KEY (key, kind)
+)
+"""
+
+
+def file_digest(source, blocksize=DIGEST_BLOCKSIZE):
+    """چکیده blake2b محتوای فایل (مسیر یا شیء فایل آپلودشده؛ شیء فایل به ابتدا برمی‌گردد)"""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(blocksize), b''):
+                h.update(block)
+        return h.hexdigest()
+
+    source.seek(0)
+    try:
+        for block in iter(lambda: source.read(blocksize), b''):
+            h.update(block)
+    finally:
+        source.seek(0)
+    return h.hexdigest()
+
+
+# نام عضو npz که مقادیر غیرآرایه‌ای نتیجه را به صورت متن JSON نگه می‌دارد
+_SCALARS_ENTRY = '__scalars__'
+
+
+def _json_default(value):
+    # اسکالرهای numpy (مانند np.int64 و np.bool_) به نوع پایتونی تبدیل می‌شوند
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"نوع غیرقابل ذخیره در کش: {type(value).__name__}")
+
+
+def encode_stats(stats):
+    """نتیجه آماری به بایت‌های npz: آرایه‌ها به صورت npy و بقیه مقادیر به صورت JSON"""
+    arrays = {key: value for key, value in stats.items() if isinstance(value, np.ndarray)}
+    scalars = {key: value for key, value in stats.items() if key not in arrays}
+    if _SCALARS_ENTRY in arrays:
+        raise ValueError(f"کلید رزروشده: {_SCALARS_ENTRY}")
+    buffer = io.BytesIO()
+    np.savez(buffer, **{_SCALARS_ENTRY: np.array(json.dumps(scalars, default=_json_default))}, **arrays)
+    return buffer.getvalue()
+
+
+def decode_stats(payload):
+    """بازگرداندن نتیجه از بایت‌های npz بدون pickle (allow_pickle=False)"""
+    with np.load(io.BytesIO(payload), allow_pickle=False) as archive:
+        stats = json.loads(str(archive[_SCALARS_ENTRY]))
+        for key in archive.files:
+            if key != _SCALARS_ENTRY:
+                stats[key] = archive[key]
+    return stats
+
+
+def cache_key(*parts):
+    """کلید ثابت از اجزای قابل تبدیل به JSON (چکیده فایل، ستون، گزینه‌های خواندن، روش و ...)"""
+    text = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class DiskCache:
+    """
+    کش LRU روی دیسک محدود به حجم کل، امن برای چند فرآیند و چند نخ
+    هر فراخوانی اتصال SQLite خود را باز می‌کند؛ فایل‌ها با جایگزینی اتمیک نوشته می‌شوند
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._index = os.path.join(self.directory, 'index.sqlite')
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self._index, timeout=SQLITE_TIMEOUT, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _array_path(self, key):
+        return os.path.join(self.directory, f'{key}.npy')
+
+    def _count(self, found):
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _lookup(self, key, kind):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT payload FROM entries WHERE key = ? AND kind = ?', (key, kind)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    'UPDATE entries SET accessed = ? WHERE key = ? AND kind = ?', (time.time(), key, kind)
+                )
+        return row
+
+    def _record(self, key, kind, nbytes, payload=None):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO entries (key, kind, nbytes, accessed, payload) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, kind, nbytes, time.time(), payload),
+            )
+        self._evict()
+
+    def _evict(self):
+        """حذف قدیمی‌ترین ورودی‌ها تا حجم کل زیر سقف برسد (در یک تراکنش انحصاری)"""
+        removed = []
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                total = conn.execute('SELECT COALESCE(SUM(nbytes), 0) FROM entries').fetchone()[0]
+                if total > self.max_bytes:
+                    for key, kind, nbytes in conn.execute(
+                        'SELECT key, kind, nbytes FROM entries ORDER BY accessed'
+                    ).fetchall():
+                        if total <= self.max_bytes:
+                            break
+                        conn.execute('DELETE FROM entries WHERE key = ? AND kind = ?', (key, kind))
+                        total -= nbytes
+                        if kind == 'array':
+                            removed.append(key)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        for key in removed:
+            # فرآیندهایی که فایل را باز کرده‌اند تا بستن آن به داده‌ها دسترسی دارند
+            with contextlib.suppress(OSError):
+                os.remove(self._array_path(key))
+
+    def get_array(self, key):
+        """ستون ذخیره‌شده به صورت memory-map فقط‌خواندنی، یا None"""
+        row = self._lookup(key, 'array')
+        arr = None
+        if row is not None:
+            try:
+                arr = np.load(self._array_path(key), mmap_mode='r')
+            except (OSError, ValueError):
+                # فایل توسط فرآیند دیگری حذف شده یا ناقص است
+                self.discard(key, 'array')
+        self._count(arr is not None)
+        return arr
+
+    def put_array(self, key, arr):
+        """ذخیره ستون با نوشتن در فایل موقت و جایگزینی اتمیک"""
+        arr = np.ascontiguousarray(arr)
+        if arr.nbytes > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, arr)
+            nbytes = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self._array_path(key))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+        self._record(key, 'array', nbytes)
+
+    def get_stats(self, key):
+        """نتیجه آماری ذخیره‌شده، یا None"""
+        row = self._lookup(key, 'stats')
+        stats = None
+        if row is not None:
+            try:
+                stats = decode_stats(row[0])
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+                self.discard(key, 'stats')
+        self._count(stats is not None)
+        return stats
+
+    def put_stats(self, key, stats):
+        payload = encode_stats(stats)
+        if len(payload) > self.max_bytes:
+            return
+        self._record(key, 'stats', len(payload), payload)
+
+    def discard(self, key, kind):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM entries WHERE key = ? AND kind = ?', (key, kind))
+        if kind == 'array':
+            with contextlib.suppress(OSError):
+                os.remove(self._array_path(key))
+
+    def clear(self):
+        with self._connect() as conn:
+            keys = [key for key, in conn.execute("SELECT key FROM entries WHERE kind = 'array'")]
+            conn.execute('DELETE FROM entries')
+        for key in keys:
+            with contextlib.suppress(OSError):
+                os.remove(self._array_path(key))
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._connect() as conn:
+            entries, total = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM entries'
+            ).fetchone()
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': entries,
+                'bytes': total,
+                'max_bytes': self.max_bytes,
+                'directory': self.directory,
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_disk_cache():
+    """کش مشترک این فرآیند بر اساس IQR_CACHE_DIR (و IQR_CACHE_MAX_BYTES)؛ بدون تنظیم None"""
+    global _default_cache
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if not directory:
+        return None
+    with _default_lock:
+        if _default_cache is None or _default_cache.directory != os.path.abspath(directory):
+            max_bytes = int(os.environ.get(CACHE_MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+            _default_cache = DiskCache(directory, max_bytes)
+        return _default_cache
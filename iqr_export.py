@@ -0,0 +1,127 @@
+"""
+ساخت فایل خروجی داده‌ها به صورت تکه‌ای و فقط هنگام درخواست
+علاوه بر CSV، قالب‌های فشرده دودویی (NPY و در صورت نصب بودن pyarrow، Parquet)
+"""
+
+import importlib.util
+import io
+import tempfile
+
+import numpy as np
+
+# تعداد سطرهای هر گروه سطر در Parquet
+EXPORT_CHUNKSIZE = 1_000_000
+
+# تعداد سطرهای هر تکه هنگام نوشتن CSV (رشته هر تکه فقط موقتاً در حافظه است)
+CSV_CHUNKSIZE = 20_000
+
+# اندازه بلوک‌های خواندن فایل موقت CSV
+SPOOL_BLOCKSIZE = 1 << 24
+
+# قالب‌های خروجی و نوع MIME هر کدام
+EXPORT_MIME_TYPES = {
+    'csv': 'text/csv',
+    'npy': 'application/octet-stream',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def available_export_formats():
+    """قالب‌های قابل استفاده در این محیط (Parquet فقط با pyarrow)"""
+    formats = ['csv', 'npy']
+    if importlib.util.find_spec('pyarrow') is not None:
+        formats.append('parquet')
+    return formats
+
+
+def sorted_slice(values, start, stop):
+    """
+    سطرهای start تا stop از نسخه مرتب‌شده values بدون مرتب‌سازی کل آرایه
+    (انتخاب جزئی O(n) و مرتب‌سازی فقط همان برش)
+    """
+    stop = min(stop, len(values))
+    if start >= stop:
+        return np.empty(0, dtype=np.asarray(values).dtype)
+    part = np.partition(values, (start, stop - 1))
+    return np.sort(part[start:stop])
+
+
+def iter_csv_chunks(values, chunksize=CSV_CHUNKSIZE, columns=('ردیف', 'مقدار')):
+    """
+    تولید تکه‌های CSV (شماره ردیف، مقدار) بدون ساختن DataFrame کامل
+    خروجی با to_csv یک DataFrame کامل بایت‌به‌بایت یکسان است
+    """
+    import pandas as pd
+
+    yield (','.join(columns) + '\n').encode('utf-8-sig')
+    for start in range(0, len(values), chunksize):
+        block = values[start:start + chunksize]
+        frame = pd.DataFrame({
+            columns[0]: np.arange(start + 1, start + len(block) + 1),
+            columns[1]: block,
+        })
+        yield frame.to_csv(index=False, header=False).encode('utf-8')
+
+
+def _preallocated_buffer(size):
+    """
+    BytesIO با حافظه رزروشده به اندازه دقیق خروجی؛ وقتی دقیقاً size بایت نوشته شود
+    getvalue همان حافظه را بدون کپی برمی‌گرداند
+    """
+    buffer = io.BytesIO()
+    if size:
+        buffer.seek(size - 1)
+        buffer.write(b'\0')
+        buffer.seek(0)
+    return buffer
+
+
+def csv_bytes(values, chunksize=CSV_CHUNKSIZE):
+    """
+    اندازه CSV از پیش معلوم نیست؛ تکه‌ها ابتدا در فایل موقت نوشته و سپس یک‌جا
+    در بافری به اندازه دقیق خوانده می‌شوند تا اوج حافظه حدود یک برابر خروجی بماند
+    """
+    with tempfile.TemporaryFile() as spool:
+        for chunk in iter_csv_chunks(values, chunksize):
+            spool.write(chunk)
+        size = spool.tell()
+        spool.seek(0)
+        buffer = _preallocated_buffer(size)
+        with buffer.getbuffer() as view:
+            filled = 0
+            while filled < size:
+                read = spool.readinto(view[filled:filled + SPOOL_BLOCKSIZE])
+                if not read:
+                    raise OSError("فایل موقت CSV ناقص خوانده شد")
+                filled += read
+    return buffer.getvalue()
+
+
+def npy_bytes(values):
+    values = np.ascontiguousarray(values)
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, np.lib.format.header_data_from_array_1_0(values))
+    buffer = _preallocated_buffer(header.tell() + values.nbytes)
+    buffer.write(header.getbuffer())
+    buffer.write(values.reshape(-1).view(np.uint8).data)
+    return buffer.getvalue()
+
+
+def parquet_bytes(values, chunksize=EXPORT_CHUNKSIZE, column='مقدار'):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    pq.write_table(pa.table({column: values}), buffer, row_group_size=chunksize)
+    return buffer.getvalue()
+
+
+def export_bytes(values, fmt, chunksize=None):
+    """محتوای فایل خروجی برای یک آرایه در قالب خواسته‌شده"""
+    if fmt == 'csv':
+        return csv_bytes(values, chunksize or CSV_CHUNKSIZE)
+    if fmt == 'npy':
+        return npy_bytes(values)
+    if fmt == 'parquet':
+        return parquet_bytes(values, chunksize or EXPORT_CHUNKSIZE)
+    raise ValueError(f"قالب خروجی نامعتبر: {fmt}")
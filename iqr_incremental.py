@@ -0,0 +1,211 @@
+"""
+حالت افزایشی: نگه‌داری ساختار مرتب داده‌ها بین اجراها
+مقادیر جدید در O(log n) درج می‌شوند و چارک‌ها بدون محاسبه دوباره کل داده به‌روز می‌شوند
+"""
+
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from iqr_ingest import FloatBuffer
+from iqr_stats import as_float_array, build_outlier_table, quartile_positions
+
+DEFAULT_BLOCK_SIZE = 2048
+
+
+class SortedBlockList:
+    """
+    لیست مرتب بلوکی: چند آرایه مرتب numpy پشت سر هم
+    درج با جستجوی دودویی روی بیشینه بلوک‌ها و سپس درون بلوک انجام می‌شود
+    """
+
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE):
+        self.block_size = block_size
+        self._blocks = []
+        self._maxes = []
+        self._cumulative = None
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def _rebuild(self, values):
+        size = self.block_size
+        self._blocks = [values[i:i + size].copy() for i in range(0, len(values), size)]
+        self._maxes = [float(block[-1]) for block in self._blocks]
+
+    def _split(self, i):
+        block = self._blocks[i]
+        half = len(block) // 2
+        self._blocks[i:i + 1] = [block[:half], block[half:]]
+        self._maxes[i:i + 1] = [float(block[half - 1]), float(block[-1])]
+
+    def update(self, values):
+        """درج دسته‌ای؛ دسته‌های بزرگ با ادغام کامل و دسته‌های کوچک بلوک به بلوک درج می‌شوند"""
+        values = np.sort(np.asarray(values, dtype=np.float64))
+        if len(values) == 0:
+            return
+        self._cumulative = None
+
+        if not self._blocks or len(values) > max(self._len // 8, self.block_size):
+            merged = np.concatenate(self._blocks + [values]) if self._blocks else values
+            merged.sort(kind='stable')
+            self._rebuild(merged)
+            self._len = len(merged)
+            return
+
+        # هر مقدار به اولین بلوکی می‌رود که بیشینه آن بزرگ‌تر یا مساوی است
+        targets = np.searchsorted(np.asarray(self._maxes), values, side='left')
+        targets = np.minimum(targets, len(self._blocks) - 1)
+        bounds = np.flatnonzero(np.diff(targets)) + 1
+        for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(values)]):
+            i = int(targets[start])
+            block = self._blocks[i]
+            chunk = values[start:stop]
+            block = np.insert(block, np.searchsorted(block, chunk), chunk)
+            self._blocks[i] = block
+            self._maxes[i] = float(block[-1])
+        self._len += len(values)
+
+        # بلوک‌های بزرگ از آخر به اول شکسته می‌شوند تا اندیس‌ها جابه‌جا نشوند
+        for i in range(len(self._blocks) - 1, -1, -1):
+            while len(self._blocks[i]) > 2 * self.block_size:
+                self._split(i)
+
+    def _counts(self):
+        if self._cumulative is None:
+            self._cumulative = np.cumsum([len(block) for block in self._blocks])
+        return self._cumulative
+
+    def __getitem__(self, rank):
+        if not 0 <= rank < self._len:
+            raise IndexError(rank)
+        counts = self._counts()
+        i = int(np.searchsorted(counts, rank, side='right'))
+        before = int(counts[i - 1]) if i else 0
+        return float(self._blocks[i][rank - before])
+
+    def rank(self, value, inclusive=False):
+        """تعداد عناصر کوچک‌تر (یا مساوی) از value"""
+        if not self._blocks:
+            return 0
+        if inclusive:
+            i = bisect_right(self._maxes, value)
+            side = 'right'
+        else:
+            i = bisect_left(self._maxes, value)
+            side = 'left'
+        counts = self._counts()
+        before = int(counts[i - 1]) if i else 0
+        if i == len(self._blocks):
+            return before
+        return before + int(np.searchsorted(self._blocks[i], value, side=side))
+
+
+class IncrementalIQR:
+    """
+    آمار IQR افزایشی: مقادیر به ترتیب ورود و در ساختار مرتب بلوکی نگه داشته می‌شوند
+    summary در O(log n) و statistics با خروجی سازگار با calculate_iqr_statistics
+    """
+
+    def __init__(self, method='tukey', multiplier=1.5, block_size=DEFAULT_BLOCK_SIZE):
+        self.method = method
+        self.multiplier = multiplier
+        self._sorted = SortedBlockList(block_size)
+        self._values = FloatBuffer()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def extend(self, numbers):
+        """افزودن مقادیر جدید"""
+        arr = as_float_array(numbers)
+        if len(arr) == 0:
+            return self
+
+        # ادغام میانگین و واریانس به روش Chan
+        count = len(self)
+        total = count + len(arr)
+        mean = float(arr.mean())
+        delta = mean - self._mean
+        self._mean += delta * len(arr) / total
+        self._m2 += float(((arr - mean) ** 2).sum()) + delta * delta * count * len(arr) / total
+
+        self._values.extend(arr)
+        self._sorted.update(arr)
+        return self
+
+    @property
+    def values(self):
+        """مقادیر به ترتیب ورود (نمای بدون کپی)"""
+        return self._values.view()
+
+    def _quantile(self, position):
+        lo, hi, frac = position
+        low = self._sorted[lo]
+        if frac == 0.0:
+            return low
+        return low + (self._sorted[hi] - low) * frac
+
+    def summary(self):
+        """چارک‌ها، مرزها و تعداد outliers بدون پیمایش کل داده‌ها"""
+        n = len(self)
+        if n < 3:
+            return None
+
+        q1, median, q3 = (self._quantile(p) for p in quartile_positions(n, self.method))
+        iqr = q3 - q1
+        lower_bound = q1 - self.multiplier * iqr
+        upper_bound = q3 + self.multiplier * iqr
+        below = self._sorted.rank(lower_bound)
+        above = n - self._sorted.rank(upper_bound, inclusive=True)
+        variance = self._m2 / n
+
+        return {
+            'min': self._sorted[0],
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'max': self._sorted[n - 1],
+            'iqr': iqr,
+            'lower_bound': lower_bound,
+            'upper_bound': upper_bound,
+            'lower_whisker': self._sorted[min(below, n - 1)],
+            'upper_whisker': self._sorted[max(n - 1 - above, 0)],
+            'outlier_count': below + above,
+            'count': n,
+            'mean': self._mean,
+            'std': float(np.sqrt(variance)),
+            'variance': variance,
+            'is_even': (n % 2 == 0),
+            'method': self.method,
+            'multiplier': self.multiplier,
+        }
+
+    def statistics(self):
+        """خروجی کامل سازگار با calculate_iqr_statistics (جدول outliers با یک ماسک برداری)"""
+        stats = self.summary()
+        if stats is None:
+            return None
+        outlier_table = build_outlier_table(self.values, stats['lower_bound'], stats['upper_bound'])
+        stats['outlier_table'] = outlier_table
+        stats['outliers'] = outlier_table['value']
+        return stats
+
+
+_SEPARATORS = frozenset(' \t\r\n,،;')
+
+
+def appended_suffix(previous, text):
+    """
+    اگر text فقط با افزودن به انتهای previous ساخته شده باشد بخش جدید را برمی‌گرداند
+    در غیر این صورت (ویرایش یا ادامه دادن عدد قبلی) None
+    """
+    if previous is None or not text.startswith(previous):
+        return None
+    suffix = text[len(previous):]
+    if previous and suffix and previous[-1] not in _SEPARATORS and suffix[0] not in _SEPARATORS:
+        return None
+    return suffix
@@ -0,0 +1,598 @@
+"""
+خواندن داده‌ها از فایل‌های آپلودشده به صورت آرایه float64
+بدون ساختن DataFrame کامل یا لیست پایتونی
+pandas فقط هنگام خواندن فایل‌ها بارگذاری می‌شود
+"""
+
+import importlib.util
+
+import numpy as np
+
+# تعداد سطرهای هر تکه در خواندن جریانی
+DEFAULT_CHUNKSIZE = 500_000
+
+# تعداد سطرهای پیش‌نمایش؛ نوع ستون‌ها از همین سطرها تشخیص داده می‌شود
+PREVIEW_ROWS = 50
+
+
+class FloatBuffer:
+    """بافر float64 قابل رشد؛ تکه‌ها بدون کپی‌های میانی به انتهای آن اضافه می‌شوند"""
+
+    def __init__(self, capacity=1024, dtype=np.float64):
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        needed = self._size + len(values)
+        if needed > len(self._data):
+            capacity = max(needed, 2 * len(self._data))
+            grown = np.empty(capacity, dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = values
+        self._size = needed
+
+    def view(self):
+        """نمای بدون کپی روی مقادیر فعلی"""
+        return self._data[:self._size]
+
+    def to_array(self):
+        """
+        آرایه نهایی؛ ظرفیت اضافی در همان حافظه آزاد می‌شود (بدون کپی)
+        اگر نمایی از view() هنوز زنده باشد، کوچک کردن در جا آن را نامعتبر می‌کند؛
+        در آن حالت numpy خطا می‌دهد و برش کپی می‌شود
+        """
+        if self._size != len(self._data):
+            try:
+                self._data.resize(self._size)
+            except ValueError:
+                self._data = self._data[:self._size].copy()
+        return self._data
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def read_csv_header(source, nrows=PREVIEW_ROWS, header='infer', sep=','):
+    """خواندن چند سطر اول برای پیش‌نمایش و فهرست ستون‌ها"""
+    import pandas as pd
+
+    _rewind(source)
+    preview = pd.read_csv(source, nrows=nrows, header=header, sep=sep)
+    _rewind(source)
+    return preview
+
+
+# جداکننده‌هایی که در تشخیص قالب CSV بررسی می‌شوند
+CSV_DELIMITERS = ',;\t|'
+
+
+def _read_sample(source, size):
+    if hasattr(source, 'read'):
+        _rewind(source)
+        sample = source.read(size)
+        _rewind(source)
+    else:
+        with open(source, 'rb') as f:
+            sample = f.read(size)
+    if isinstance(sample, bytes):
+        sample = sample.decode('utf-8-sig', errors='replace')
+    # سطر آخر ممکن است ناقص باشد
+    if len(sample) >= size and '\n' in sample:
+        sample = sample[:sample.rindex('\n')]
+    return sample
+
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def sniff_csv_format(source, sample_size=64 * 1024):
+    """
+    تشخیص جداکننده و وجود سرستون فقط از روی نمونه ابتدای فایل
+    خروجی: (جداکننده، 'infer' یا None برای header در read_csv)
+    تشخیص سرستون حدسی است (سرستون‌های تمام‌عددی داده فرض می‌شوند) و فقط پیش‌فرض رابط کاربری است
+    """
+    import csv
+
+    sample = _read_sample(source, sample_size)
+    sniffer = csv.Sniffer()
+    try:
+        sep = sniffer.sniff(sample, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        sep = ','
+
+    first = next(csv.reader((line for line in sample.splitlines() if line.strip()), delimiter=sep), None)
+    if not first:
+        return sep, 'infer'
+    # سطر اولی که همه خانه‌هایش عدد است داده است، نه سرستون
+    if all(_is_number(field) for field in first if field.strip()):
+        return sep, None
+    try:
+        return sep, 'infer' if sniffer.has_header(sample) else None
+    except csv.Error:
+        return sep, 'infer'
+
+
+def iter_csv_column(source, column, chunksize=DEFAULT_CHUNKSIZE, header='infer', sep=','):
+    """
+    خواندن جریانی یک ستون از CSV به صورت تکه‌های float64
+    فقط ستون انتخاب‌شده تجزیه می‌شود و مقادیر خالی حذف می‌شوند
+    """
+    import pandas as pd
+
+    _rewind(source)
+    reader = pd.read_csv(
+        source,
+        header=header,
+        sep=sep,
+        usecols=[column],
+        dtype={column: np.float64},
+        chunksize=chunksize,
+    )
+    with reader:
+        for chunk in reader:
+            values = chunk.iloc[:, 0].to_numpy(dtype=np.float64, copy=False)
+            nan_mask = np.isnan(values)
+            if nan_mask.any():
+                values = values[~nan_mask]
+            if len(values):
+                yield values
+
+
+def collect_chunks(chunks, dtype=np.float64):
+    """جمع کردن تکه‌ها در یک آرایه پیوسته (با dtype=float32 هر تکه هنگام درج فشرده می‌شود)"""
+    buffer = FloatBuffer(dtype=dtype)
+    for chunk in chunks:
+        buffer.extend(chunk)
+    return buffer.to_array()
+
+
+def read_csv_column(source, column, chunksize=DEFAULT_CHUNKSIZE, header='infer', sep=','):
+    """خواندن یک ستون CSV به صورت آرایه float64"""
+    return collect_chunks(iter_csv_column(source, column, chunksize, header, sep))
+
+
+def read_csv_columns(source, columns, chunksize=DEFAULT_CHUNKSIZE, header='infer', sep=','):
+    """
+    خواندن چند ستون عددی به صورت یک ماتریس float64 (سطرها × ستون‌ها)
+    مقادیر خالی به صورت NaN می‌مانند تا هر ستون جداگانه پردازش شود
+    """
+    import pandas as pd
+
+    columns = list(columns)
+    _rewind(source)
+    reader = pd.read_csv(
+        source,
+        header=header,
+        sep=sep,
+        usecols=columns,
+        dtype={column: np.float64 for column in columns},
+        chunksize=chunksize,
+    )
+    with reader:
+        blocks = [chunk[columns].to_numpy(dtype=np.float64) for chunk in reader]
+    if not blocks:
+        return np.empty((0, len(columns)))
+    return np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+
+
+def read_csv_grouped(source, value_column, group_column, chunksize=DEFAULT_CHUNKSIZE, header='infer',
+                     sep=','):
+    """
+    خواندن ستون مقدار و ستون گروه برای محاسبه گروهی
+    خروجی: (آرایه float64 مقادیر، آرایه برچسب‌های متنی گروه‌ها)
+    """
+    import pandas as pd
+
+    _rewind(source)
+    reader = pd.read_csv(
+        source,
+        header=header,
+        sep=sep,
+        usecols=[value_column, group_column],
+        dtype={value_column: np.float64, group_column: str},
+        chunksize=chunksize,
+    )
+    values = FloatBuffer()
+    labels = []
+    with reader:
+        for chunk in reader:
+            values.extend(chunk[value_column].to_numpy(dtype=np.float64))
+            labels.append(chunk[group_column].fillna('—').to_numpy(dtype=str))
+    if not labels:
+        return np.empty(0), np.empty(0, dtype=str)
+    return values.to_array(), np.concatenate(labels)
+
+
+def has_calamine():
+    """آیا خواننده Rust (python-calamine) برای Excel نصب است؟"""
+    return importlib.util.find_spec('python_calamine') is not None
+
+
+# فایل xlsx یک بسته zip است؛ XML برگه‌ها مستقیم و جریانی خوانده می‌شوند
+# تا مدل کامل کارپوشه (مانند openpyxl/pandas) ساخته نشود
+_XLSX_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_XLSX_NS = '{' + _XLSX_MAIN + '}'
+_XLSX_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+# نام عناصر در expat با جداکننده فضای نام « »
+_XLSX_ROW = _XLSX_MAIN + ' row'
+_XLSX_CELL = _XLSX_MAIN + ' c'
+_XLSX_TEXT_TAGS = frozenset((_XLSX_MAIN + ' v', _XLSX_MAIN + ' t'))
+
+# اندازه هر بلوک از XML فشرده‌نشده برگه که به تجزیه‌گر داده می‌شود
+_XLSX_BLOCKSIZE = 1 << 20
+
+
+def _xlsx_sheets(archive):
+    import xml.etree.ElementTree as ET
+
+    return list(ET.fromstring(archive.read('xl/workbook.xml')).find(_XLSX_NS + 'sheets'))
+
+
+def _xlsx_sheet_path(archive, sheet):
+    # مسیر XML برگه در بسته از روی workbook.xml و روابط آن
+    import xml.etree.ElementTree as ET
+
+    sheets = _xlsx_sheets(archive)
+    if sheet is None:
+        entry = sheets[0]
+    else:
+        entry = next((item for item in sheets if item.get('name') == sheet), None)
+        if entry is None:
+            raise KeyError(f"برگه «{sheet}» در فایل وجود ندارد")
+    rel_id = entry.get(_XLSX_REL_NS + 'id')
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    target = next(rel.get('Target') for rel in rels if rel.get('Id') == rel_id)
+    return target.lstrip('/') if target.startswith('/') else 'xl/' + target
+
+
+def _xlsx_shared_strings(archive):
+    import xml.etree.ElementTree as ET
+
+    try:
+        root = ET.fromstring(archive.read('xl/sharedStrings.xml'))
+    except KeyError:
+        return []
+    return [''.join(node.text or '' for node in item.iter(_XLSX_NS + 't')) for item in root]
+
+
+def _xlsx_column_number(ref):
+    # «BC12» -> 54 (شماره ستون از صفر)
+    number = 0
+    for ch in ref:
+        if ch.isdigit():
+            break
+        number = number * 26 + ord(ch) - 64
+    return number - 1
+
+
+def _xlsx_typed_value(text, kind):
+    # نوع پایتونی خانه برای پیش‌نمایش (مانند مقادیر openpyxl)
+    if kind == 'b':
+        return text == '1'
+    if kind in (None, 'n'):
+        try:
+            return int(text)
+        except ValueError:
+            return float(text)
+    return text
+
+
+class _XlsxRowParser:
+    """
+    تجزیه جریانی XML برگه با expat بدون ساختن درخت عناصر
+    فقط متن خام خانه‌های ستون‌های indices نگه داشته می‌شود؛
+    با indices=None همه ستون‌ها با نوع پایتونی برگردانده می‌شوند (برای پیش‌نمایش)
+    """
+
+    def __init__(self, indices, skip, shared_strings):
+        import xml.parsers.expat
+
+        self._wanted = None if indices is None else {
+            index: position for position, index in enumerate(indices)
+        }
+        self._width = 0 if indices is None else len(indices)
+        self._skip = skip
+        self._shared_strings = shared_strings
+        self._rows = []
+        self._values = self._new_row()
+        self._row_number = 0
+        self._column = -1
+        self._position = None
+        self._kind = None
+        self._text = None
+        self._collecting = False
+
+        self._parser = xml.parsers.expat.ParserCreate(namespace_separator=' ')
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._characters
+
+    def _new_row(self):
+        return {} if self._wanted is None else [None] * self._width
+
+    def _start(self, name, attrs):
+        if name == _XLSX_CELL:
+            ref = attrs.get('r')
+            self._column = _xlsx_column_number(ref) if ref else self._column + 1
+            self._position = self._column if self._wanted is None else self._wanted.get(self._column)
+            self._kind = attrs.get('t')
+            self._text = None
+        elif name == _XLSX_ROW:
+            ref = attrs.get('r')
+            row_number = int(ref) if ref else self._row_number + 1
+            if self._wanted is None:
+                # سطرهای خالی حذف‌شده از XML در پیش‌نمایش به صورت سطر خالی می‌آیند
+                self._rows.extend([] for _ in range(max(self._skip, self._row_number) + 1, row_number))
+            self._row_number = row_number
+            self._column = -1
+        elif self._position is not None and name in _XLSX_TEXT_TAGS:
+            self._collecting = True
+            if self._text is None:
+                self._text = []
+
+    def _characters(self, data):
+        if self._collecting:
+            self._text.append(data)
+
+    def _end(self, name):
+        if name == _XLSX_CELL:
+            # خانه بدون مقدار (مثلاً فرمول محاسبه‌نشده) خالی در نظر گرفته می‌شود
+            if self._position is not None and self._text:
+                value = ''.join(self._text)
+                if self._kind == 's':
+                    value = self._shared_strings()[int(value)]
+                if self._wanted is None:
+                    value = _xlsx_typed_value(value, self._kind)
+                self._values[self._position] = value
+            self._position = None
+        elif name == _XLSX_ROW:
+            if self._row_number > self._skip:
+                values = self._values
+                if self._wanted is None:
+                    values = [values.get(i) for i in range(max(values, default=-1) + 1)]
+                self._rows.append(values)
+            self._values = self._new_row()
+        elif name in _XLSX_TEXT_TAGS:
+            self._collecting = False
+
+    def feed(self, data, final=False):
+        """تجزیه یک بلوک و برگرداندن سطرهای کامل‌شده"""
+        self._parser.Parse(data, final)
+        rows, self._rows = self._rows, []
+        return rows
+
+
+def _iter_xlsx_blocks(source, sheet, indices, skip):
+    """
+    پیمایش جریانی برگه و برگرداندن دسته‌هایی از سطرها (فقط ستون‌های indices)
+    مقادیر به صورت متن خام برگردانده می‌شوند تا تبدیل به float یک‌جا در numpy انجام شود
+    حافظه به اندازه یک بلوک است و به تعداد سطرها بستگی ندارد
+    """
+    import zipfile
+
+    _rewind(source)
+    try:
+        with zipfile.ZipFile(source) as archive:
+            strings = []
+
+            def shared_strings():
+                # جدول رشته‌های مشترک فقط در صورت نیاز خوانده می‌شود
+                if not strings:
+                    strings.append(_xlsx_shared_strings(archive))
+                return strings[0]
+
+            parser = _XlsxRowParser(indices, skip, shared_strings)
+            with archive.open(_xlsx_sheet_path(archive, sheet)) as stream:
+                while True:
+                    block = stream.read(_XLSX_BLOCKSIZE)
+                    rows = parser.feed(block, final=not block)
+                    if rows:
+                        yield rows
+                    if not block:
+                        break
+    finally:
+        _rewind(source)
+
+
+def list_excel_sheets(source):
+    """نام برگه‌های کارپوشه بدون خواندن سطرها"""
+    import zipfile
+
+    _rewind(source)
+    try:
+        with zipfile.ZipFile(source) as archive:
+            return [entry.get('name') for entry in _xlsx_sheets(archive)]
+    finally:
+        _rewind(source)
+
+
+def _excel_column_names(row):
+    # نام‌گذاری مانند pandas: خانه خالی «Unnamed: i» و نام تکراری با پسوند «.1»
+    names, seen = [], {}
+    for i, value in enumerate(row):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _excel_floats(values):
+    # خانه‌های خالی NaN می‌شوند؛ متن غیرعددی مانند astype(float) خطا می‌دهد
+    return np.array(values, dtype=np.float64)
+
+
+def read_excel_header(source, sheet=None, nrows=PREVIEW_ROWS, header='infer'):
+    """خواندن فقط چند سطر اول یک برگه برای پیش‌نمایش و فهرست ستون‌ها"""
+    import pandas as pd
+
+    skip = 1 if header == 'infer' else 0
+    rows = []
+    blocks = _iter_xlsx_blocks(source, sheet, None, 0)
+    try:
+        for block in blocks:
+            rows.extend(block)
+            if len(rows) >= nrows + skip:
+                break
+    finally:
+        blocks.close()
+
+    rows = rows[:nrows + skip]
+    width = max((len(row) for row in rows), default=0)
+    rows = [row + [None] * (width - len(row)) for row in rows]
+    if header == 'infer':
+        names = _excel_column_names(rows[0]) if rows else []
+    else:
+        names = list(range(width))
+    return pd.DataFrame(rows[skip:], columns=names).infer_objects()
+
+
+def _excel_column_index(source, sheet, column, header):
+    if header != 'infer':
+        return int(column)
+    names = list(read_excel_header(source, sheet, nrows=0, header=header).columns)
+    return names.index(column)
+
+
+def iter_excel_column(source, column, sheet=None, header='infer'):
+    """
+    خواندن جریانی یک ستون از برگه Excel به صورت تکه‌های float64
+    با python-calamine (در صورت نصب) از خواننده سریع pandas استفاده می‌شود،
+    وگرنه XML برگه مستقیم و فقط برای همان ستون پیمایش می‌شود
+    """
+    index = _excel_column_index(source, sheet, column, header)
+
+    if has_calamine():
+        import pandas as pd
+
+        _rewind(source)
+        frame = pd.read_excel(
+            source,
+            engine='calamine',
+            sheet_name=0 if sheet is None else sheet,
+            header=0 if header == 'infer' else None,
+            usecols=[index],
+        )
+        values = _excel_floats(frame.iloc[:, 0].to_numpy())
+        values = values[~np.isnan(values)]
+        if len(values):
+            yield values
+        return
+
+    for rows in _iter_xlsx_blocks(source, sheet, [index], 1 if header == 'infer' else 0):
+        values = _excel_floats(rows).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            yield values
+
+
+def read_excel_column(source, column, sheet=None, header='infer'):
+    """خواندن یک ستون Excel به صورت آرایه float64"""
+    return collect_chunks(iter_excel_column(source, column, sheet, header))
+
+
+def read_excel_columns(source, columns, sheet=None, header='infer'):
+    """
+    خواندن چند ستون عددی Excel به صورت ماتریس float64 (سطرها × ستون‌ها)
+    مقادیر خالی به صورت NaN می‌مانند
+    """
+    indices = [_excel_column_index(source, sheet, column, header) for column in columns]
+    blocks = [
+        _excel_floats(rows)
+        for rows in _iter_xlsx_blocks(source, sheet, indices, 1 if header == 'infer' else 0)
+    ]
+    if not blocks:
+        return np.empty((0, len(indices)))
+    return np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+
+
+def read_excel_grouped(source, value_column, group_column, sheet=None, header='infer'):
+    """
+    خواندن ستون مقدار و ستون گروه از برگه Excel برای محاسبه گروهی
+    خروجی مانند read_csv_grouped: (آرایه float64 مقادیر، آرایه برچسب‌های متنی گروه‌ها)
+    """
+    indices = [_excel_column_index(source, sheet, column, header) for column in (value_column, group_column)]
+    values = FloatBuffer()
+    labels = []
+    for rows in _iter_xlsx_blocks(source, sheet, indices, 1 if header == 'infer' else 0):
+        values.extend(_excel_floats([row[0] for row in rows]))
+        labels.append(np.array(['—' if row[1] is None else row[1] for row in rows], dtype=str))
+    if not labels:
+        return np.empty(0), np.empty(0, dtype=str)
+    return values.to_array(), np.concatenate(labels)
+
+
+# تبدیل ارقام فارسی/عربی و جداکننده‌ها به معادل لاتین در یک گذر translate
+_DIGIT_TABLE = {ord(ch): str(i) for i, ch in enumerate('۰۱۲۳۴۵۶۷۸۹')}
+_DIGIT_TABLE.update({ord(ch): str(i) for i, ch in enumerate('٠١٢٣٤٥٦٧٨٩')})
+_DIGIT_TABLE.update({
+    ord('٫'): '.',   # جداکننده اعشار عربی
+    ord('٬'): None,  # جداکننده هزارگان عربی
+    ord('،'): ' ',   # ویرگول فارسی
+    ord(','): ' ',
+    ord(';'): ' ',
+    ord('−'): '-',   # علامت منفی یونیکد
+})
+
+_NAN_TOKENS = frozenset(('nan', '+nan', '-nan'))
+
+
+def normalize_number_text(text):
+    """یکسان‌سازی ارقام و جداکننده‌های محلی"""
+    return text.translate(_DIGIT_TABLE)
+
+
+def parse_numbers(text):
+    """
+    تبدیل کل متن ورودی به آرایه float64 در یک گذر برداری
+    خروجی: (آرایه اعداد معتبر، لیست (شماره، مورد) برای موارد نامعتبر)
+    """
+    tokens = normalize_number_text(text).split()
+    if not tokens:
+        return np.empty(0), []
+
+    try:
+        # مسیر سریع: تبدیل یک‌جای همه توکن‌ها در numpy
+        values = np.array(tokens, dtype=np.float64)
+    except ValueError:
+        import pandas as pd
+
+        # وجود مورد نامعتبر: تبدیل با coerce و مشخص کردن موقعیت‌ها
+        values = pd.to_numeric(
+            pd.Series(tokens, dtype=object), errors='coerce'
+        ).to_numpy(dtype=np.float64, copy=True)
+        # pandas برخی توکن‌های پذیرفته‌شده در مسیر سریع (مانند «1_000» یا ارقام تمام‌عرض) را رد می‌کند؛
+        # این موارد با همان قواعد مسیر سریع دوباره تبدیل می‌شوند تا اعتبار هر توکن مستقل از بقیه باشد
+        for i in np.flatnonzero(np.isnan(values)):
+            try:
+                values[i] = float(tokens[i])
+            except ValueError:
+                pass
+
+    nan_mask = np.isnan(values)
+    if not nan_mask.any():
+        return values, []
+
+    # فقط موارد NaN بررسی می‌شوند تا «nan» نوشته‌شده با مورد نامعتبر اشتباه نشود
+    invalid = [
+        (int(i) + 1, tokens[i]) for i in np.flatnonzero(nan_mask)
+        if tokens[i].lower() not in _NAN_TOKENS
+    ]
+    return values[~nan_mask], invalid
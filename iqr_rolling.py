@@ -0,0 +1,218 @@
+"""
+شناسایی داده‌های پرت با پنجره لغزان برای داده‌های دارای ترتیب زمانی
+پنجره در یک لیست مرتب بلوکی با درخت فنویک روی اندازه بلوک‌ها نگه داشته می‌شود:
+هر گام یک درج، یک حذف و چند جستجوی رتبه، هر کدام O(log w)؛
+پنجره‌های کوچک در یک لیست مرتب ساده که برای آن‌ها سریع‌تر است
+"""
+
+from bisect import bisect_left, insort
+from collections import deque
+
+import numpy as np
+
+from iqr_stats import as_float_array, quartile_positions
+
+# اندازه هدف هر بلوک؛ بلوک‌های بزرگ‌تر از دو برابر آن شکسته و بلوک‌های خیلی کوچک ادغام می‌شوند
+WINDOW_BLOCK_SIZE = 1024
+
+# پنجره‌های تا این اندازه در یک لیست مرتب ساده نگه داشته می‌شوند (جابه‌جایی حافظه ناچیز است)
+FLAT_WINDOW_LIMIT = 2048
+
+# تعداد مقادیری که هر بار از آرایه numpy به float پایتونی تبدیل می‌شوند
+ROLLING_CHUNKSIZE = 1 << 16
+
+
+class IndexedSortedList:
+    """
+    لیست مرتب با درج، حذف و دسترسی بر اساس رتبه در O(log n)
+    مقادیر در بلوک‌های مرتب پایتونی و تعداد هر بلوک در یک درخت فنویک نگه داشته می‌شود
+    """
+
+    def __init__(self, block_size=WINDOW_BLOCK_SIZE):
+        self.block_size = block_size
+        self._blocks = []
+        self._maxes = []
+        self._tree = [0]
+        self._top = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def _rebuild(self):
+        # ساخت درخت فنویک در O(تعداد بلوک‌ها) پس از شکستن یا ادغام بلوک‌ها
+        tree = [0] + [len(block) for block in self._blocks]
+        size = len(tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._top = 1 << (len(self._blocks).bit_length() - 1) if self._blocks else 0
+
+    def _adjust(self, i, delta):
+        tree = self._tree
+        i += 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def add(self, value):
+        self._len += 1
+        if not self._blocks:
+            self._blocks.append([value])
+            self._maxes.append(value)
+            self._rebuild()
+            return
+
+        i = bisect_left(self._maxes, value)
+        if i == len(self._blocks):
+            i -= 1
+        block = self._blocks[i]
+        insort(block, value)
+        self._maxes[i] = block[-1]
+        if len(block) > 2 * self.block_size:
+            half = len(block) // 2
+            self._blocks[i:i + 1] = [block[:half], block[half:]]
+            self._maxes[i:i + 1] = [block[half - 1], block[-1]]
+            self._rebuild()
+        else:
+            self._adjust(i, 1)
+
+    def remove(self, value):
+        """حذف یک نمونه از value (باید در لیست موجود باشد)"""
+        # اولین بلوکی که بیشینه آن بزرگ‌تر یا مساوی value است حتماً آن را دارد
+        i = bisect_left(self._maxes, value)
+        block = self._blocks[i]
+        del block[bisect_left(block, value)]
+        self._len -= 1
+
+        if len(block) < self.block_size // 4 and len(self._blocks) > 1:
+            # ادغام بلوک کوچک با همسایه تا تعداد بلوک‌ها محدود بماند
+            j = i - 1 if i > 0 else i
+            merged = self._blocks[j] + self._blocks[j + 1]
+            self._blocks[j:j + 2] = [merged]
+            self._maxes[j:j + 2] = [merged[-1]]
+            if len(merged) > 2 * self.block_size:
+                half = len(merged) // 2
+                self._blocks[j:j + 1] = [merged[:half], merged[half:]]
+                self._maxes[j:j + 1] = [merged[half - 1], merged[-1]]
+            self._rebuild()
+        elif not block:
+            del self._blocks[i]
+            del self._maxes[i]
+            self._rebuild()
+        else:
+            self._maxes[i] = block[-1]
+            self._adjust(i, -1)
+
+    def _locate(self, rank):
+        """(بلوک، جایگاه درون بلوک) برای یک رتبه با پیمایش درخت فنویک"""
+        if len(self._blocks) == 1:
+            return self._blocks[0], rank
+        tree = self._tree
+        size = len(tree)
+        pos = 0
+        step = self._top
+        while step:
+            nxt = pos + step
+            if nxt < size and tree[nxt] <= rank:
+                pos = nxt
+                rank -= tree[nxt]
+            step >>= 1
+        return self._blocks[pos], rank
+
+    def __getitem__(self, rank):
+        if not 0 <= rank < self._len:
+            raise IndexError(rank)
+        block, offset = self._locate(rank)
+        return block[offset]
+
+    def quantile(self, position):
+        """مقدار درون‌یابی‌شده بین دو رتبه؛ رتبه‌های مجاور معمولاً با یک پیمایش پیدا می‌شوند"""
+        lo, hi, frac = position
+        block, offset = self._locate(lo)
+        low = block[offset]
+        if frac == 0.0:
+            return low
+        if hi == lo + 1 and offset + 1 < len(block):
+            high = block[offset + 1]
+        else:
+            high = self[hi]
+        return low + (high - low) * frac
+
+
+def rolling_iqr(numbers, window=50, method='tukey', multiplier=1.5, min_periods=None):
+    """
+    مرزهای IQR متحرک روی پنجره انتهایی (داده فعلی و window-1 داده قبلی)
+    هزینه: O(n log w) با لیست مرتب اندیس‌دار به جای مرتب‌سازی دوباره هر پنجره
+    حافظه اضافه O(w): فقط مقادیر داخل پنجره به صورت float پایتونی نگه داشته می‌شوند
+    خروجی: آرایه‌های q1، q3، مرز پایین/بالا برای هر نقطه و ماسک داده‌های پرت
+    نقاطی که پنجره آن‌ها کمتر از min_periods داده دارد NaN می‌گیرند و پرت حساب نمی‌شوند
+    """
+    if window < 3:
+        raise ValueError("اندازه پنجره باید حداقل 3 باشد")
+    if min_periods is None:
+        min_periods = window
+    min_periods = max(3, min(min_periods, window))
+
+    arr = as_float_array(numbers)
+    n = len(arr)
+    q1 = np.full(n, np.nan)
+    median = np.full(n, np.nan)
+    q3 = np.full(n, np.nan)
+
+    if window <= FLAT_WINDOW_LIMIT:
+        sorted_window = []
+
+        def add(value):
+            insort(sorted_window, value)
+
+        def remove(value):
+            del sorted_window[bisect_left(sorted_window, value)]
+
+        def quantile(position):
+            lo, hi, frac = position
+            low = sorted_window[lo]
+            if frac == 0.0:
+                return low
+            return low + (sorted_window[hi] - low) * frac
+    else:
+        sorted_window = IndexedSortedList()
+        add, remove, quantile = sorted_window.add, sorted_window.remove, sorted_window.quantile
+    recent = deque()
+    full_positions = quartile_positions(window, method)
+
+    for start in range(0, n, ROLLING_CHUNKSIZE):
+        for i, value in enumerate(arr[start:start + ROLLING_CHUNKSIZE].tolist(), start):
+            add(value)
+            recent.append(value)
+            size = len(recent)
+            if size > window:
+                # حذف مقداری که از پنجره خارج شده است
+                remove(recent.popleft())
+                size = window
+            if size < min_periods:
+                continue
+            positions = full_positions if size == window else quartile_positions(size, method)
+            q1[i] = quantile(positions[0])
+            median[i] = quantile(positions[1])
+            q3[i] = quantile(positions[2])
+
+    iqr = q3 - q1
+    lower_bound = q1 - multiplier * iqr
+    upper_bound = q3 + multiplier * iqr
+    # مقایسه با NaN همیشه False است، پس نقاط ابتدای سری پرت حساب نمی‌شوند
+    outlier_mask = (arr < lower_bound) | (arr > upper_bound)
+
+    return {
+        'values': arr,
+        'window': window,
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lower_bound': lower_bound,
+        'upper_bound': upper_bound,
+        'outlier_mask': outlier_mask,
+        'outlier_count': int(outlier_mask.sum()),
+    }
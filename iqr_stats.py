@@ -0,0 +1,812 @@
+"""
+موتور محاسبه چارک‌ها و آمار IQR
+فقط به numpy وابسته است و در هر دو برنامه استفاده می‌شود
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# روش‌های محاسبه چارک
+# tukey: روش دقیق (میانه نیمه پایینی و بالایی) همان‌طور که در app.py توضیح داده شده
+# linear: درون‌یابی خطی، معادل پیش‌فرض np.percentile
+QUARTILE_METHODS = ('tukey', 'linear')
+
+
+def _median_position(start, length):
+    """موقعیت (پایین، بالا) میانه در بازه‌ای از داده‌های مرتب"""
+    mid = start + length // 2
+    if length % 2 == 1:
+        return mid, mid, 0.0
+    return mid - 1, mid, 0.5
+
+
+def _linear_position(n, fraction):
+    """موقعیت درون‌یابی خطی برای صدک مورد نظر (مانند np.percentile)"""
+    pos = fraction * (n - 1)
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, n - 1)
+    return lo, hi, pos - lo
+
+
+def quartile_positions(n, method='tukey'):
+    """
+    رتبه‌های مورد نیاز برای Q1، میانه و Q3 در داده‌های مرتب با طول n
+    خروجی: سه تایی (رتبه پایین، رتبه بالا، وزن درون‌یابی) برای هر چارک
+    """
+    if method not in QUARTILE_METHODS:
+        raise ValueError(f"روش نامعتبر: {method}")
+
+    if method == 'tukey':
+        half = n // 2
+        return (
+            _median_position(0, half),
+            _median_position(0, n),
+            _median_position(n - half, half),
+        )
+
+    return (
+        _linear_position(n, 0.25),
+        _linear_position(n, 0.5),
+        _linear_position(n, 0.75),
+    )
+
+
+def _interpolate(values, position):
+    # درون‌یابی همیشه در float64 انجام می‌شود (حتی برای داده‌های float32)
+    lo, hi, frac = position
+    low = float(values[lo])
+    if frac == 0.0:
+        return low
+    return low + (float(values[hi]) - low) * frac
+
+
+def compute_quartiles(arr, method='tukey'):
+    """
+    محاسبه کمینه، Q1، میانه، Q3 و بیشینه با انتخاب جزئی (np.partition)
+    به جای مرتب‌سازی کامل؛ همه رتبه‌ها در یک فراخوانی partition پیدا می‌شوند
+    """
+    n = len(arr)
+    positions = quartile_positions(n, method)
+
+    ranks = {0, n - 1}
+    for lo, hi, _ in positions:
+        ranks.update((lo, hi))
+    kth = sorted(ranks)
+
+    part = np.partition(arr, kth)
+    q1, median, q3 = (_interpolate(part, p) for p in positions)
+
+    return {
+        'min': float(part[0]),
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'max': float(part[n - 1]),
+    }
+
+
+# مسیر شمارشی برای داده‌های صحیح با دامنه محدود (مثلاً زمان به میلی‌ثانیه یا امتیازها)
+# چارک‌ها از جمع تجمعی تعدادها پیدا می‌شوند: O(n + k) به جای انتخاب مقایسه‌ای
+COUNTING_MIN_SIZE = 1024
+COUNTING_MAX_RANGE = 1 << 22
+COUNTING_PROBE = 64
+COUNTING_CHUNKSIZE = 1 << 20
+
+
+def integer_counts(arr):
+    """
+    تعداد تکرار هر مقدار صحیح از کمینه تا بیشینه با np.bincount (تکه‌ای و با حافظه محدود)
+    اگر داده‌ها صحیح نباشند یا دامنه از تعداد داده‌ها بزرگ‌تر باشد None برمی‌گرداند
+    خروجی: (مقادیر float64 از کمینه تا بیشینه، تعداد هر مقدار)
+    """
+    n = len(arr)
+    if n < COUNTING_MIN_SIZE:
+        return None
+    # بررسی سریع ابتدای داده‌ها تا داده‌های اعشاری بدون گذر کامل رد شوند
+    probe = arr[:COUNTING_PROBE]
+    if not np.array_equal(probe, np.trunc(probe)):
+        return None
+
+    low, high = float(arr.min()), float(arr.max())
+    if not (np.isfinite(low) and np.isfinite(high)) or high - low >= min(n, COUNTING_MAX_RANGE):
+        return None
+
+    size = int(high - low) + 1
+    counts = np.zeros(size, dtype=np.int64)
+    for start in range(0, n, COUNTING_CHUNKSIZE):
+        shifted = arr[start:start + COUNTING_CHUNKSIZE] - np.float64(low)
+        offsets = shifted.astype(np.intp)
+        if not np.array_equal(offsets, shifted):
+            return None
+        counts += np.bincount(offsets, minlength=size)
+    return low + np.arange(size, dtype=np.float64), counts
+
+
+def cumulative_quartiles(values, cumulative, method='tukey'):
+    """
+    Q1، میانه و Q3 از جدول فراوانی مرتب با جمع تجمعی تعدادها
+    مقدار رتبه r در داده‌های بازشده: اولین ردیفی که تجمعی آن از r بیشتر است
+    """
+    positions = quartile_positions(int(cumulative[-1]), method)
+    ranks = np.array([(lo, hi) for lo, hi, _ in positions], dtype=np.int64)
+    at_rank = values[np.searchsorted(cumulative, ranks, side='right')]
+    return tuple(_interpolate(at_rank[i], (0, 1, frac)) for i, (_, _, frac) in enumerate(positions))
+
+
+def weighted_quartiles(values, weights):
+    """
+    Q1، میانه و Q3 برای وزن‌های غیرصحیح: درون‌یابی خطی بین نقاط میانی جرم تجمعی هر ردیف
+    مستقل از مقیاس وزن‌ها (وزن‌های نرمال‌شده با مجموع ۱ هم پذیرفته می‌شوند)
+    """
+    cumulative = np.cumsum(weights)
+    midpoints = (cumulative - weights / 2) / cumulative[-1]
+    return tuple(float(q) for q in np.interp((0.25, 0.5, 0.75), midpoints, values))
+
+
+def weighted_whiskers(values, counts, lower_bound, upper_bound):
+    """انتهای سبیل‌ها از جدول فراوانی: کوچک‌ترین و بزرگ‌ترین مقدار موجود داخل مرزها"""
+    inside = (counts > 0) & (values >= lower_bound) & (values <= upper_bound)
+    return (
+        float(np.min(values, where=inside, initial=np.inf)),
+        float(np.max(values, where=inside, initial=-np.inf)),
+    )
+
+
+# ساختار جدول داده‌های پرت: اندیس اصلی، مقدار، سمت (-1 پایین، +1 بالا) و فاصله از مرز
+OUTLIER_DTYPE = np.dtype([
+    ('index', np.int64),
+    ('value', np.float64),
+    ('side', np.int8),
+    ('distance', np.float64),
+])
+
+
+def build_outlier_table(arr, lower_bound, upper_bound):
+    """ساخت آرایه ساختاریافته داده‌های پرت با عملیات برداری (به ترتیب ورودی)"""
+    # مرزها float64 می‌مانند تا مقایسه با داده‌های float32 به دقت مرز گرد نشود
+    lower_bound = np.float64(lower_bound)
+    upper_bound = np.float64(upper_bound)
+    low = arr < lower_bound
+    high = arr > upper_bound
+    index = np.flatnonzero(low | high)
+    values = arr[index].astype(np.float64)
+    is_low = low[index]
+
+    table = np.empty(len(index), dtype=OUTLIER_DTYPE)
+    table['index'] = index
+    table['value'] = values
+    table['side'] = np.where(is_low, -1, 1)
+    table['distance'] = np.where(is_low, lower_bound - values, values - upper_bound)
+    return table
+
+
+def top_outliers(table, k=None, by_severity=True):
+    """
+    داده‌های پرت مرتب‌شده بر اساس شدت (فاصله از مرز)، در صورت نیاز فقط k مورد اول
+    برای k کوچک ابتدا با argpartition انتخاب و سپس فقط همان‌ها مرتب می‌شوند
+    """
+    if not by_severity:
+        return table if k is None else table[:k]
+
+    distance = table['distance']
+    if k is not None and k < len(table):
+        picked = np.argpartition(-distance, k - 1)[:k] if k > 0 else np.empty(0, dtype=np.intp)
+        order = picked[np.argsort(-distance[picked], kind='stable')]
+    else:
+        order = np.argsort(-distance, kind='stable')
+    return table[order]
+
+
+# انواع ذخیره‌سازی مجاز؛ float32 نصف حافظه را مصرف می‌کند و بدون کپی پردازش می‌شود
+STORAGE_DTYPES = (np.float64, np.float32)
+
+
+def as_float_array(numbers):
+    """تبدیل ورودی به آرایه float64 (آرایه float32 بدون کپی می‌ماند) و حذف مقادیر NaN"""
+    arr = np.asarray(numbers)
+    if arr.dtype not in STORAGE_DTYPES:
+        arr = arr.astype(np.float64)
+    if arr.ndim != 1:
+        arr = arr.ravel()
+    nan_mask = np.isnan(arr)
+    if nan_mask.any():
+        arr = arr[~nan_mask]
+    return arr
+
+
+# اندازه تکه‌ها در انباشت float64 میانگین و واریانس داده‌های float32
+MOMENT_CHUNKSIZE = 1 << 20
+
+
+def mean_variance(arr):
+    """
+    میانگین و واریانس جمعیت با انباشت float64
+    برای float32 به صورت تکه‌ای محاسبه می‌شود تا کپی float64 کامل ساخته نشود
+    """
+    if arr.dtype == np.float64:
+        return float(np.mean(arr)), float(np.var(arr))
+
+    n = len(arr)
+    total = 0.0
+    for start in range(0, n, MOMENT_CHUNKSIZE):
+        total += float(np.sum(arr[start:start + MOMENT_CHUNKSIZE], dtype=np.float64))
+    mean = total / n
+    squares = 0.0
+    for start in range(0, n, MOMENT_CHUNKSIZE):
+        deviations = arr[start:start + MOMENT_CHUNKSIZE].astype(np.float64) - mean
+        squares += float(np.dot(deviations, deviations))
+    return mean, squares / n
+
+
+def calculate_iqr_statistics(numbers, method='tukey', multiplier=1.5):
+    """محاسبه آمار IQR و داده‌های پرت در یک گذر انتخاب"""
+    arr = as_float_array(numbers)
+    n = len(arr)
+    if n < 3:
+        return None
+
+    # داده‌های صحیح با دامنه محدود: مسیر شمارشی با نتایج یکسان
+    counted = integer_counts(arr)
+    if counted is not None:
+        values, counts = counted
+        q1, median, q3 = cumulative_quartiles(values, np.cumsum(counts), method)
+        quartiles = {'min': float(values[0]), 'median': median, 'max': float(values[-1])}
+    else:
+        quartiles = compute_quartiles(arr, method)
+        q1 = quartiles['q1']
+        q3 = quartiles['q3']
+
+    iqr = q3 - q1
+    lower_bound = q1 - multiplier * iqr
+    upper_bound = q3 + multiplier * iqr
+
+    # شناسایی outliers به ترتیب ورودی
+    outlier_table = build_outlier_table(arr, lower_bound, upper_bound)
+    # انتهای سبیل‌ها: کوچک‌ترین و بزرگ‌ترین داده داخل مرزها
+    if counted is not None:
+        lower_whisker, upper_whisker = weighted_whiskers(values, counts, lower_bound, upper_bound)
+    else:
+        inlier_mask = np.ones(n, dtype=bool)
+        inlier_mask[outlier_table['index']] = False
+        lower_whisker = float(np.min(arr, where=inlier_mask, initial=np.inf))
+        upper_whisker = float(np.max(arr, where=inlier_mask, initial=-np.inf))
+    mean, variance = mean_variance(arr)
+
+    return {
+        'min': quartiles['min'],
+        'q1': q1,
+        'median': quartiles['median'],
+        'q3': q3,
+        'max': quartiles['max'],
+        'iqr': float(iqr),
+        'lower_bound': float(lower_bound),
+        'upper_bound': float(upper_bound),
+        'lower_whisker': lower_whisker,
+        'upper_whisker': upper_whisker,
+        'outliers': outlier_table['value'],
+        'outlier_table': outlier_table,
+        'count': n,
+        'mean': mean,
+        'std': float(np.sqrt(variance)),
+        'variance': variance,
+        'is_even': (n % 2 == 0),
+        'method': method,
+        'multiplier': multiplier,
+    }
+
+
+# ستون‌های خلاصه نتایج برای خروجی‌های JSON/CSV
+SUMMARY_FIELDS = (
+    'count', 'min', 'q1', 'median', 'q3', 'max', 'iqr',
+    'lower_bound', 'upper_bound', 'outlier_count', 'mean', 'std', 'variance',
+)
+
+# ستون‌های اضافه نتایج تقریبی (اسکچ): کران خطای رتبه چارک‌ها و خطای تعداد outliers
+APPROXIMATE_FIELDS = ('approximate', 'rank_error', 'outlier_count_error')
+
+
+def summarize(stats):
+    """خلاصه عددی یک نتیجه (بدون لیست‌ها و آرایه‌ها) برای ذخیره یا چاپ"""
+    summary = {field: stats.get(field) for field in SUMMARY_FIELDS}
+    if summary['outlier_count'] is None:
+        summary['outlier_count'] = len(stats['outliers'])
+    if stats.get('approximate'):
+        summary.update((field, stats.get(field)) for field in APPROXIMATE_FIELDS)
+    return summary
+
+
+# محاسبه دسته‌ای برای چند ستون
+def _median_position_array(start, length):
+    mid = start + length // 2
+    odd = (length % 2 == 1)
+    return np.where(odd, mid, mid - 1), mid, np.where(odd, 0.0, 0.5)
+
+
+def quartile_positions_array(counts, method='tukey'):
+    """
+    نسخه برداری quartile_positions برای آرایه‌ای از طول‌ها
+    خروجی: سه آرایه (رتبه پایین، رتبه بالا، وزن) با شکل (3, تعداد ستون‌ها)
+    """
+    if method not in QUARTILE_METHODS:
+        raise ValueError(f"روش نامعتبر: {method}")
+    n = np.asarray(counts, dtype=np.int64)
+
+    if method == 'tukey':
+        half = n // 2
+        positions = (
+            _median_position_array(0, half),
+            _median_position_array(0, n),
+            _median_position_array(n - half, half),
+        )
+    else:
+        positions = []
+        for fraction in (0.25, 0.5, 0.75):
+            pos = fraction * np.maximum(n - 1, 0)
+            lo = np.floor(pos).astype(np.int64)
+            positions.append((lo, np.minimum(lo + 1, np.maximum(n - 1, 0)), pos - lo))
+
+    lo, hi, frac = (np.stack(part) for part in zip(*positions))
+    return lo, hi, frac
+
+
+def batch_iqr_statistics(matrix, method='tukey', multiplier=1.5):
+    """
+    آمار IQR همه ستون‌های یک ماتریس دوبعدی در یک عملیات برداری
+    مقادیر NaN در هر ستون جداگانه حذف می‌شوند؛ ستون‌های کمتر از ۳ مقدار NaN می‌گیرند
+    خروجی: دیکشنری از آرایه‌های یک‌بعدی (یک عنصر برای هر ستون)
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.ndim != 2:
+        raise ValueError("ورودی باید دوبعدی باشد")
+    if matrix.shape[0] == 0:
+        # ماتریس بدون سطر (مثلاً فایل فقط با سرستون): یک سطر NaN تا همه ستون‌ها شمارش صفر و نتیجه NaN بگیرند
+        matrix = np.full((1, matrix.shape[1]), np.nan)
+
+    nan_mask = np.isnan(matrix)
+    counts = matrix.shape[0] - nan_mask.sum(axis=0)
+    safe_counts = np.maximum(counts, 1)
+    lo, hi, frac = quartile_positions_array(safe_counts, method)
+    # برای ستون‌های خیلی کوچک رتبه‌ها به بازه معتبر محدود می‌شوند (نتیجه بعداً NaN می‌شود)
+    lo = np.clip(lo, 0, safe_counts - 1)
+    hi = np.clip(hi, 0, safe_counts - 1)
+
+    if nan_mask.any():
+        # NaN در انتهای هر ستون قرار می‌گیرد، پس رتبه‌ها برای همه ستون‌ها معتبرند
+        ordered = np.sort(matrix, axis=0)
+    else:
+        kth = np.unique(np.concatenate((lo.ravel(), hi.ravel(), [0, matrix.shape[0] - 1])))
+        ordered = np.partition(matrix, kth, axis=0)
+
+    low_values = np.take_along_axis(ordered, lo, axis=0)
+    high_values = np.take_along_axis(ordered, hi, axis=0)
+    q1, median, q3 = low_values + (high_values - low_values) * frac
+
+    iqr = q3 - q1
+    lower_bound = q1 - multiplier * iqr
+    upper_bound = q3 + multiplier * iqr
+    # مقایسه با NaN همیشه False است، پس NaN در شمارش outliers حساب نمی‌شود
+    low_counts = (matrix < lower_bound).sum(axis=0)
+    high_counts = (matrix > upper_bound).sum(axis=0)
+
+    columns = np.arange(matrix.shape[1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nansum(matrix, axis=0) / counts
+        variance = np.nansum((matrix - mean) ** 2, axis=0) / counts
+
+    result = {
+        'count': counts,
+        'min': ordered[0],
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'max': ordered[safe_counts - 1, columns],
+        'iqr': iqr,
+        'lower_bound': lower_bound,
+        'upper_bound': upper_bound,
+        'low_outliers': low_counts,
+        'high_outliers': high_counts,
+        'outlier_count': low_counts + high_counts,
+        'mean': mean,
+        'std': np.sqrt(variance),
+        'variance': variance,
+    }
+
+    too_small = counts < 3
+    if too_small.any():
+        for key, values in result.items():
+            if values.dtype.kind == 'f':
+                values[too_small] = np.nan
+    return result
+
+
+# محاسبه گروهی: چارک‌ها و مرزها برای هر دسته
+GROUP_OUTLIER_DTYPE = np.dtype([
+    ('group', np.int64),
+    ('index', np.int64),
+    ('value', np.float64),
+    ('side', np.int8),
+    ('distance', np.float64),
+])
+
+
+def grouped_iqr_statistics(numbers, groups, method='tukey', multiplier=1.5):
+    """
+    آمار IQR برای هر گروه با یک مرتب‌سازی بر اساس (گروه، مقدار) و انتخاب قطعه‌ای
+    groups آرایه‌ای هم‌طول با numbers است (هر نوع قابل مقایسه)
+    خروجی: آرایه‌های یک‌بعدی برای هر گروه به همراه جدول outliers با کد گروه
+    """
+    values = np.asarray(numbers, dtype=np.float64)
+    groups = np.asarray(groups)
+    if values.shape != groups.shape or values.ndim != 1:
+        raise ValueError("numbers و groups باید یک‌بعدی و هم‌طول باشند")
+
+    index = np.arange(len(values))
+    valid = ~np.isnan(values)
+    if not valid.all():
+        values, groups, index = values[valid], groups[valid], index[valid]
+    if len(values) == 0:
+        return None
+
+    names, codes = np.unique(groups, return_inverse=True)
+    codes = codes.ravel()
+    counts = np.bincount(codes, minlength=len(names))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # مرتب‌سازی بر اساس (گروه، مقدار): ابتدا مقادیر، سپس مرتب‌سازی پایدار کدها
+    # با کوچک‌ترین نوع صحیح ممکن تا numpy از radix sort استفاده کند
+    order = np.argsort(values)
+    small_codes = codes[order].astype(np.min_scalar_type(max(len(names) - 1, 0)))
+    ordered = values[order[np.argsort(small_codes, kind='stable')]]
+
+    safe_counts = np.maximum(counts, 1)
+    lo, hi, frac = quartile_positions_array(safe_counts, method)
+    lo = starts + np.clip(lo, 0, safe_counts - 1)
+    hi = starts + np.clip(hi, 0, safe_counts - 1)
+    q1, median, q3 = ordered[lo] + (ordered[hi] - ordered[lo]) * frac
+
+    iqr = q3 - q1
+    lower_bound = q1 - multiplier * iqr
+    upper_bound = q3 + multiplier * iqr
+
+    too_small = counts < 3
+    # گروه‌های کوچک مرز ندارند و outlier هم ندارند
+    lower_bound[too_small] = -np.inf
+    upper_bound[too_small] = np.inf
+
+    point_lower = lower_bound[codes]
+    point_upper = upper_bound[codes]
+    low = values < point_lower
+    high = values > point_upper
+    picked = np.flatnonzero(low | high)
+
+    outlier_table = np.empty(len(picked), dtype=GROUP_OUTLIER_DTYPE)
+    outlier_table['group'] = codes[picked]
+    outlier_table['index'] = index[picked]
+    outlier_table['value'] = values[picked]
+    is_low = low[picked]
+    outlier_table['side'] = np.where(is_low, -1, 1)
+    outlier_table['distance'] = np.where(
+        is_low, point_lower[picked] - values[picked], values[picked] - point_upper[picked]
+    )
+
+    # انتهای سبیل‌ها: داده‌های پرت در ابتدا و انتهای هر قطعه مرتب‌شده قرار دارند
+    low_counts = np.bincount(codes[low], minlength=len(names))
+    high_counts = np.bincount(codes[high], minlength=len(names))
+    lower_whisker = ordered[np.minimum(starts + low_counts, len(ordered) - 1)]
+    upper_whisker = ordered[np.maximum(starts + counts - 1 - high_counts, 0)]
+
+    sums = np.bincount(codes, weights=values, minlength=len(names))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = sums / counts
+        deviations = values - mean[codes]
+        variance = np.bincount(codes, weights=deviations * deviations, minlength=len(names)) / counts
+
+    result = {
+        'groups': names,
+        'count': counts,
+        'min': ordered[starts],
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'max': ordered[starts + safe_counts - 1],
+        'iqr': iqr,
+        'lower_bound': lower_bound,
+        'upper_bound': upper_bound,
+        'lower_whisker': lower_whisker,
+        'upper_whisker': upper_whisker,
+        'outlier_count': low_counts + high_counts,
+        'mean': mean,
+        'std': np.sqrt(variance),
+        'variance': variance,
+        'outlier_table': outlier_table,
+    }
+    for key in ('q1', 'median', 'q3', 'iqr', 'lower_bound', 'upper_bound'):
+        result[key][too_small] = np.nan
+    return result
+
+
+# محاسبه از جدول فراوانی (مقدار، تعداد) بدون بازکردن سطرهای تکراری
+# ساختار جدول داده‌های پرت: مقدار متمایز، تعداد تکرار (یا وزن)، سمت و فاصله از مرز
+FREQUENCY_OUTLIER_DTYPE = np.dtype([
+    ('value', np.float64),
+    ('count', np.int64),
+    ('side', np.int8),
+    ('distance', np.float64),
+])
+WEIGHTED_OUTLIER_DTYPE = np.dtype([
+    ('value', np.float64),
+    ('count', np.float64),
+    ('side', np.int8),
+    ('distance', np.float64),
+])
+
+
+def frequency_table(values, counts):
+    """
+    آماده‌سازی جدول فراوانی: حذف مقادیر NaN و تعدادهای صفر، مرتب‌سازی بر اساس مقدار
+    تعدادها/وزن‌ها باید متناهی و نامنفی باشند؛ اگر همه صحیح باشند int64 و در غیر این صورت float64
+    مقادیر تکراری مجازند و جمع نمی‌شوند
+    """
+    values = np.asarray(values, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.float64)
+    if values.shape != counts.shape or values.ndim != 1:
+        raise ValueError("values و counts باید یک‌بعدی و هم‌طول باشند")
+
+    valid = ~(np.isnan(values) | np.isnan(counts))
+    values, counts = values[valid], counts[valid]
+    if np.any(counts < 0) or not np.isfinite(counts).all():
+        raise ValueError("ستون تعداد/وزن باید فقط اعداد متناهی نامنفی داشته باشد")
+
+    keep = counts > 0
+    values, counts = values[keep], counts[keep]
+    if np.array_equal(counts, np.floor(counts)):
+        counts = counts.astype(np.int64)
+    order = np.argsort(values, kind='stable')
+    return values[order], counts[order]
+
+
+def frequency_iqr_statistics(values, counts, method='tukey', multiplier=1.5):
+    """
+    آمار IQR از جدول فراوانی با جست‌وجوی رتبه‌ها در توزیع تجمعی
+    برای تعدادهای صحیح دقیقاً برابر با calculate_iqr_statistics روی داده‌های بازشده است
+    برای وزن‌های غیرصحیح از weighted_quartiles استفاده می‌شود (روش‌های tukey و linear یکسان‌اند)
+    زمان و حافظه به تعداد مقادیر متمایز بستگی دارد، نه به مجموع تعدادها
+    """
+    values, counts = frequency_table(values, counts)
+    integral = counts.dtype.kind == 'i'
+    if integral:
+        cumulative = np.cumsum(counts)
+        n = int(cumulative[-1]) if len(cumulative) else 0
+        if n < 3:
+            return None
+        q1, median, q3 = cumulative_quartiles(values, cumulative, method)
+    else:
+        if method not in QUARTILE_METHODS:
+            raise ValueError(f"روش نامعتبر: {method}")
+        # جمع با گرد کردن درست تا مجموع وزن‌های نرمال‌شده دقیقاً ۱ بماند
+        n = math.fsum(counts)
+        q1, median, q3 = weighted_quartiles(values, counts)
+
+    iqr = q3 - q1
+    lower_bound = q1 - multiplier * iqr
+    upper_bound = q3 + multiplier * iqr
+
+    low = values < lower_bound
+    high = values > upper_bound
+    picked = np.flatnonzero(low | high)
+    is_low = low[picked]
+    outlier_table = np.empty(
+        len(picked), dtype=FREQUENCY_OUTLIER_DTYPE if integral else WEIGHTED_OUTLIER_DTYPE
+    )
+    outlier_table['value'] = values[picked]
+    outlier_table['count'] = counts[picked]
+    outlier_table['side'] = np.where(is_low, -1, 1)
+    outlier_table['distance'] = np.where(
+        is_low, lower_bound - values[picked], values[picked] - upper_bound
+    )
+
+    lower_whisker, upper_whisker = weighted_whiskers(values, counts, lower_bound, upper_bound)
+
+    weights = counts.astype(np.float64)
+    mean = float(np.dot(values, weights) / n)
+    deviations = values - mean
+    variance = float(np.dot(weights, deviations * deviations) / n)
+
+    return {
+        'min': float(values[0]),
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'max': float(values[-1]),
+        'iqr': float(iqr),
+        'lower_bound': float(lower_bound),
+        'upper_bound': float(upper_bound),
+        'lower_whisker': lower_whisker,
+        'upper_whisker': upper_whisker,
+        # مقادیر متمایز پرت (برای نمودار جعبه‌ای)؛ تعداد کل در outlier_count
+        'outliers': outlier_table['value'],
+        'outlier_table': outlier_table,
+        'outlier_count': outlier_table['count'].sum().item(),
+        'count': n,
+        'distinct': len(values),
+        'weighted': not integral,
+        'mean': mean,
+        'std': float(np.sqrt(variance)),
+        'variance': variance,
+        'is_even': integral and n % 2 == 0,
+        'method': method,
+        'multiplier': multiplier,
+    }
+
+
+# کش نتایج بر اساس محتوای داده
+def content_digest(arr):
+    """چکیده سریع محتوای بافر عددی (blake2b روی بایت‌های خام)"""
+    arr = np.ascontiguousarray(arr)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(arr.dtype).encode())
+    h.update(str(arr.shape).encode())
+    h.update(memoryview(arr).cast('B'))
+    return h.hexdigest()
+
+
+def _result_nbytes(result):
+    """تخمین حجم یک نتیجه در حافظه"""
+    size = 512
+    for value in result.values():
+        # نماها (مانند outliers روی جدول داده‌های پرت) دوباره شمرده نمی‌شوند
+        if isinstance(value, np.ndarray) and value.base is None:
+            size += value.nbytes
+        elif isinstance(value, (list, tuple)):
+            size += 8 * len(value)
+    return size
+
+
+class StatsCache:
+    """کش LRU محدود به تعداد و حجم کل، با شمارنده hit/miss و امن برای چند نخ"""
+
+    def __init__(self, max_entries=64, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = _result_nbytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+            }
+
+
+# کش مشترک بین همه نشست‌های یک فرآیند
+default_cache = StatsCache()
+
+
+def cached_iqr_statistics(numbers, method='tukey', multiplier=1.5, cache=None):
+    """نسخه کش‌شده calculate_iqr_statistics با کلید چکیده محتوا، روش و ضریب"""
+    if cache is None:
+        cache = default_cache
+    arr = as_float_array(numbers)
+    digest = content_digest(arr)
+    key = (digest, method, float(multiplier))
+
+    result = cache.get(key)
+    if result is None:
+        result = calculate_iqr_statistics(arr, method, multiplier)
+        if result is None:
+            return None
+        # چکیده در نتیجه نگه داشته می‌شود تا کش‌های وابسته دوباره هش نکنند
+        result['digest'] = digest
+        cache.put(key, result)
+    return dict(result)
+
+
+# هیستوگرام سمت سرور
+HISTOGRAM_RULES = ('fixed', 'fd', 'sturges')
+MAX_HISTOGRAM_BINS = 1000
+
+
+def histogram_range(numbers, stats):
+    """
+    بازه دسته‌ها از کمینه و بیشینه متناهی داده‌ها
+    مقادیر ±inf در هیستوگرام شمرده نمی‌شوند؛ فقط در این حالت داده‌ها دوباره پیمایش می‌شوند
+    """
+    lo, hi = stats['min'], stats['max']
+    if np.isfinite(lo) and np.isfinite(hi):
+        return lo, hi
+    arr = as_float_array(numbers)
+    finite = arr[np.isfinite(arr)]
+    if len(finite) == 0:
+        return 0.0, 0.0
+    return float(finite.min()), float(finite.max())
+
+
+def histogram_bin_count(stats, rule='fixed', bins=30, data_range=None):
+    """
+    تعداد دسته‌ها بر اساس قاعده انتخابی
+    fixed: تعداد ثابت، fd: فریدمن-دیاکونیس با IQR محاسبه‌شده، sturges: log2(n)+1
+    data_range: طول بازه متناهی داده‌ها (پیش‌فرض: بیشینه منهای کمینه)
+    """
+    if rule not in HISTOGRAM_RULES:
+        raise ValueError(f"قاعده نامعتبر: {rule}")
+
+    n = stats['count']
+    if data_range is None:
+        data_range = stats['max'] - stats['min']
+    width = 2.0 * stats['iqr'] / n ** (1.0 / 3.0)
+    if rule == 'fd' and 0 < data_range < np.inf and 0 < width < np.inf:
+        bins = int(np.ceil(data_range / width))
+    elif rule != 'fixed':
+        bins = int(np.ceil(np.log2(n))) + 1
+    return int(min(max(bins, 1), MAX_HISTOGRAM_BINS))
+
+
+def compute_histogram(numbers, stats, rule='fixed', bins=30):
+    """شمارش برداری دسته‌ها با لبه‌های یکنواخت؛ خروجی (counts, edges)"""
+    arr = as_float_array(numbers)
+    lo, hi = histogram_range(arr, stats)
+    nbins = histogram_bin_count(stats, rule, bins, hi - lo)
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.histogram(arr, bins=nbins, range=(lo, hi))
+
+
+def cached_histogram(numbers, stats, rule='fixed', bins=30, cache=None):
+    """هیستوگرام کش‌شده در کنار آمار، با همان چکیده محتوای داده"""
+    if cache is None:
+        cache = default_cache
+    digest = stats.get('digest') or content_digest(as_float_array(numbers))
+    lo, hi = histogram_range(numbers, stats)
+    key = (digest, 'histogram', rule, histogram_bin_count(stats, rule, bins, hi - lo))
+
+    result = cache.get(key)
+    if result is None:
+        counts, edges = compute_histogram(numbers, stats, rule, bins)
+        result = {'counts': counts, 'edges': edges}
+        cache.put(key, result)
+    return result['counts'], result['edges']